@@ -0,0 +1,186 @@
+# batch.py
+# Many independent headless matches in a process pool, each with its own
+# seed and config overrides; per-match stats go into one results table.
+#   python batch.py --seeds 20 --set DETECTION_RANGE=200,300 --set CHARGE_COOLDOWN=2.0,3.5
+#   python batch.py --seeds 200 --ticks 7200 --workers 8 --out results.csv
+# The game reads config with `from config import X` at import time, so each
+# chunk of matches runs in a fresh worker process that patches config before
+# importing the game. Every config combination plays the same seeds.
+import argparse
+import ast
+import csv
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+import config
+
+FIELDS = [
+    "config", "seed", "ticks", "death_time", "npcs_alive", "npcs_total",
+    "survival", "shots_fired", "npc_shots", "path_calls", "path_nodes", "flow_builds", "wall_s",
+]
+
+
+# ---------------------------------------
+# WORKER
+# ---------------------------------------
+def run_chunk(task):
+    overrides, seeds, ticks, npc_count = task
+    for k, v in overrides.items():
+        setattr(config, k, v)
+    from headless import HeadlessRunner, BotInput
+
+    label = config_label(overrides)
+    rows = []
+    for seed in seeds:
+        t = time.perf_counter()
+        runner = HeadlessRunner(seed=seed, npc_count=npc_count, inputs=BotInput())
+        ran = runner.run(ticks)
+        world, player = runner.world, runner.player
+        alive = sum(1 for n in world.npcs if n.alive)
+        total = len(world.npcs)
+        # pathfinding work that actually ran: A*/HPA* searches, or flow
+        # field rebuilds (the default on small maps)
+        path_calls = world.pathfinder.calls + (world.hpa.calls if world.hpa is not None else 0)
+        rows.append({
+            "config": label,
+            "seed": seed,
+            "ticks": ran,
+            "death_time": None if player.alive else round(ran * runner.dt, 3),
+            "npcs_alive": alive,
+            "npcs_total": total,
+            "survival": round(alive / total, 3) if total else 0.0,
+            "shots_fired": player.shots_fired,
+            "npc_shots": world.projectiles.spawned - player.shots_fired,
+            "path_calls": path_calls,
+            "path_nodes": world.path_nodes(),
+            "flow_builds": world.flow.builds if world.flow is not None else 0,
+            "wall_s": round(time.perf_counter() - t, 3),
+        })
+    return rows
+
+
+def config_label(overrides):
+    return " ".join(f"{k}={v}" for k, v in overrides.items()) or "default"
+
+
+# ---------------------------------------
+# DRIVER
+# ---------------------------------------
+def parse_set(spec):
+    # "NAME=v1,v2,..." -> (NAME, [v1, v2, ...])
+    name, _, values = spec.partition("=")
+    name = name.strip()
+    if not hasattr(config, name):
+        raise argparse.ArgumentTypeError(f"config has no {name}")
+    try:
+        vals = [ast.literal_eval(v.strip()) for v in values.split(",")]
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"bad values in {spec!r}")
+    return name, vals
+
+
+def config_grid(sets):
+    # cartesian product of every --set
+    names = [name for name, _ in sets]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(vals for _, vals in sets))]
+
+
+def make_tasks(grid, seeds, chunk, ticks, npc_count):
+    tasks = []
+    for overrides in grid:
+        for i in range(0, len(seeds), chunk):
+            tasks.append((overrides, seeds[i:i + chunk], ticks, npc_count))
+    return tasks
+
+
+def run_batch(grid, seeds, ticks, npc_count, workers, chunk=4, progress=None):
+    tasks = make_tasks(grid, seeds, chunk, ticks, npc_count)
+    rows = []
+    # spawn + one task per child: every chunk imports the game fresh
+    # (children inherit the environment: no pygame banner per chunk)
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers, maxtasksperchild=1) as pool:
+        for done, chunk_rows in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+            rows.extend(chunk_rows)
+            if progress is not None:
+                progress(done, len(tasks))
+    order = {config_label(o): i for i, o in enumerate(grid)}
+    rows.sort(key=lambda r: (order[r["config"]], r["seed"]))
+    return rows
+
+
+def summarize(rows):
+    # one line per config: means over its matches
+    groups = {}
+    for r in rows:
+        groups.setdefault(r["config"], []).append(r)
+    out = []
+    for label, rs in groups.items():
+        deaths = [r["death_time"] for r in rs if r["death_time"] is not None]
+        k = len(rs)
+        out.append({
+            "config": label,
+            "matches": k,
+            "deaths": len(deaths),
+            "mean_death_time": sum(deaths) / len(deaths) if deaths else None,
+            "mean_survival": sum(r["survival"] for r in rs) / k,
+            "mean_shots": sum(r["shots_fired"] for r in rs) / k,
+            "mean_path_nodes": sum(r["path_nodes"] for r in rs) / k,
+            "mean_flow_builds": sum(r["flow_builds"] for r in rs) / k,
+        })
+    return out
+
+
+def print_summary(summary):
+    w = max([len("config")] + [len(s["config"]) for s in summary])
+    print(f"{'config':<{w}}  {'matches':>7}  {'deaths':>6}  {'death_t':>8}  {'survival':>8}  {'shots':>7}  {'path_n':>8}  {'flow':>6}")
+    for s in summary:
+        dt = "-" if s["mean_death_time"] is None else f"{s['mean_death_time']:.1f}"
+        print(f"{s['config']:<{w}}  {s['matches']:>7}  {s['deaths']:>6}  {dt:>8}  "
+              f"{s['mean_survival']:>8.3f}  {s['mean_shots']:>7.1f}  {s['mean_path_nodes']:>8.1f}  {s['mean_flow_builds']:>6.1f}")
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: ("" if v is None else v) for k, v in r.items()})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run many headless matches in parallel.")
+    ap.add_argument("--seeds", type=int, default=8, help="matches per config")
+    ap.add_argument("--seed-base", type=int, default=0)
+    ap.add_argument("--ticks", type=int, default=3600, help="tick limit per match")
+    ap.add_argument("--npcs", type=int, default=config.NPC_COUNT)
+    ap.add_argument("--set", type=parse_set, action="append", default=[], metavar="NAME=V1,V2",
+                    help="config override; repeat for a grid of combinations")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk", type=int, default=4, help="matches per worker process")
+    ap.add_argument("--out", help="write every match as a CSV row")
+    args = ap.parse_args()
+
+    grid = config_grid(args.set)
+    seeds = list(range(args.seed_base, args.seed_base + args.seeds))
+
+    def progress(done, total):
+        print(f"\r{done}/{total} chunks", end="", file=sys.stderr, flush=True)
+
+    t = time.perf_counter()
+    rows = run_batch(grid, seeds, args.ticks, args.npcs, args.workers, max(1, args.chunk), progress)
+    elapsed = time.perf_counter() - t
+    print(file=sys.stderr)
+
+    print_summary(summarize(rows))
+    print(f"{len(rows)} matches in {elapsed:.1f}s on {args.workers} workers")
+    if args.out:
+        write_csv(args.out, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# batch_steering.py
+# Vectorized version of steering.py + BaseNPC.apply_force for the whole swarm.
+# steering.py stays as the per-object reference implementation.
+import numpy as np
+
+from config import NEIGHBOR_RADIUS
+from spatial import CellIndex
+
+SEP_RADIUS = 50.0
+COHESION_SPEED = 40.0
+W_SEP = 1.2
+W_ALIGN = 0.4
+SMOOTHING = 6.0
+
+
+class BatchSteering:
+    def __init__(self, capacity=64):
+        self._alloc(capacity)
+        self.n = 0
+        self.requests = []
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.vel = np.zeros((capacity, 2), dtype=np.float64)
+        self.max_speed = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def load(self, npcs):
+        n = len(npcs)
+        if n > self.capacity:
+            self._alloc(max(n, self.capacity * 2))
+        self.n = n
+        pos, vel = self.pos, self.vel
+        for i, npc in enumerate(npcs):
+            pos[i, 0] = npc.pos[0]
+            pos[i, 1] = npc.pos[1]
+            vel[i, 0] = npc.vel[0]
+            vel[i, 1] = npc.vel[1]
+            self.max_speed[i] = npc.max_speed
+            self.alive[i] = npc.alive
+
+    # ---------------------------------------
+    # FORCES
+    # ---------------------------------------
+    def flock_forces(self, rows):
+        # separation, cohesion and alignment for the given rows against every
+        # alive NPC within NEIGHBOR_RADIUS (self excluded), like npc.neighbors()
+        n = self.n
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        m = len(rows)
+        # candidate pairs from the 3x3 block of NEIGHBOR_RADIUS cells
+        qi, j = CellIndex(pos, NEIGHBOR_RADIUS).pairs(pos[rows])
+
+        diff = pos[rows[qi]] - pos[j]
+        d2 = diff[:, 0] * diff[:, 0] + diff[:, 1] * diff[:, 1]
+        near = (d2 < NEIGHBOR_RADIUS * NEIGHBOR_RADIUS) & self.alive[:n][j] & (j != rows[qi])
+        qi, j, diff, d2 = qi[near], j[near], diff[near], d2[near]
+
+        count = np.bincount(qi, minlength=m)
+        has = count > 0
+        cnt = np.maximum(count, 1)
+
+        # separation: sum of normalize(diff) * 60/dist = diff * 60/dist^2
+        close = (d2 < SEP_RADIUS * SEP_RADIUS) & (d2 > 0)
+        k = np.zeros(len(d2))
+        k[close] = 60.0 / d2[close]
+        sep = np.empty((m, 2))
+        sep[:, 0] = np.bincount(qi, weights=diff[:, 0] * k, minlength=m)
+        sep[:, 1] = np.bincount(qi, weights=diff[:, 1] * k, minlength=m)
+
+        # cohesion: seek(pos, mean neighbor pos, 40)
+        coh = np.empty((m, 2))
+        coh[:, 0] = np.bincount(qi, weights=pos[j, 0], minlength=m) / cnt
+        coh[:, 1] = np.bincount(qi, weights=pos[j, 1], minlength=m) / cnt
+        coh -= pos[rows]
+        mag = np.hypot(coh[:, 0], coh[:, 1])
+        ok = has & (mag > 0)
+        coh[ok] *= (COHESION_SPEED / mag[ok])[:, None]
+        coh[~ok] = 0.0
+
+        # alignment: mean neighbor velocity
+        ali = np.empty((m, 2))
+        ali[:, 0] = np.bincount(qi, weights=vel[j, 0], minlength=m) / cnt
+        ali[:, 1] = np.bincount(qi, weights=vel[j, 1], minlength=m) / cnt
+
+        return sep, coh, ali
+
+    def squad_forces(self, rows, squads):
+        # separation from pairs within SEP_RADIUS only; cohesion and
+        # alignment from the squad sums (squads.py) minus the NPC itself
+        n = self.n
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        m = len(rows)
+        qi, j = CellIndex(pos, SEP_RADIUS).pairs(pos[rows])
+        diff = pos[rows[qi]] - pos[j]
+        d2 = diff[:, 0] * diff[:, 0] + diff[:, 1] * diff[:, 1]
+        close = (d2 < SEP_RADIUS * SEP_RADIUS) & (d2 > 0) & self.alive[:n][j] & (j != rows[qi])
+        qi, diff, d2 = qi[close], diff[close], d2[close]
+        k = 60.0 / d2
+        sep = np.empty((m, 2))
+        sep[:, 0] = np.bincount(qi, weights=diff[:, 0] * k, minlength=m)
+        sep[:, 1] = np.bincount(qi, weights=diff[:, 1] * k, minlength=m)
+
+        coh = np.zeros((m, 2))
+        ali = np.zeros((m, 2))
+        s = squads.of_arr[rows]
+        has = s >= 0
+        if not len(squads.count_arr) or not has.any():
+            return sep, coh, ali
+        r = rows[has]
+        s = s[has]
+        others = squads.count_arr[s] - 1
+        ok = others > 0
+        r, s, others = r[ok], s[ok], others[ok][:, None]
+        has[has] = ok
+
+        # cohesion: seek(pos, other members' centroid, 40)
+        d = (squads.sum_pos[s] - pos[r]) / others - pos[r]
+        mag = np.hypot(d[:, 0], d[:, 1])
+        nz = mag > 0
+        d[nz] *= (COHESION_SPEED / mag[nz])[:, None]
+        d[~nz] = 0.0
+        coh[has] = d
+        # alignment: other members' mean velocity
+        ali[has] = (squads.sum_vel[s] - vel[r]) / others
+        return sep, coh, ali
+
+    def seek_forces(self, rows, targets):
+        d = targets - self.pos[rows]
+        mag = np.hypot(d[:, 0], d[:, 1])[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d = np.where(mag > 0, d / mag, 0.0)
+        return d * self.max_speed[rows][:, None]
+
+    def engage_forces(self, rows, targets, w_coh, squads=None):
+        sep, coh, ali = self.flock_forces(rows) if squads is None else self.squad_forces(rows, squads)
+        sk = self.seek_forces(rows, targets)
+        return sk + sep * W_SEP + coh * w_coh[:, None] + ali * W_ALIGN
+
+    # ---------------------------------------
+    # INTEGRATION
+    # ---------------------------------------
+    def apply_force(self, rows, desired, dt, occupancy):
+        # dt: one step for every row, or one per row (LOD-skipped NPCs
+        # integrate the time they were skipped)
+        if np.ndim(dt):
+            dt = np.asarray(dt, dtype=np.float64)[:, None]
+        vel = self.vel[rows]
+        vel += (desired - vel) * (dt * SMOOTHING)
+
+        # clamp speed
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        ms = self.max_speed[rows]
+        over = speed > ms
+        if over.any():
+            vel[over] *= (ms[over] / speed[over])[:, None]
+
+        new = self.pos[rows] + vel * dt
+        blocked = occupancy.contains_many(new)
+        vel[blocked] = 0.0
+        keep = ~blocked
+        self.pos[rows[keep]] = new[keep]
+        self.vel[rows] = vel
+
+    def step(self, rows, targets, w_coh, dt, occupancy, squads=None):
+        desired = self.engage_forces(rows, targets, w_coh, squads)
+        self.apply_force(rows, desired, dt, occupancy)
+
+    # ---------------------------------------
+    # WORLD INTEGRATION
+    # ---------------------------------------
+    def request(self, npc, target, w_coh, dt):
+        # queued by BaseNPC.steer_to with the NPC's own step, solved
+        # together in flush()
+        self.requests.append((npc.idx, target[0], target[1], w_coh, dt))
+
+    def flush(self, world):
+        if not self.requests:
+            return
+        npcs = world.npcs
+        self.load(npcs)
+        req = np.array(self.requests, dtype=np.float64)
+        self.requests = []
+        rows = req[:, 0].astype(np.intp)
+        self.step(rows, req[:, 1:3], req[:, 3], req[:, 4], world.occupancy, world.squads)
+
+        for i in rows.tolist():
+            n = npcs[i]
+            n.pos[0] = float(self.pos[i, 0])
+            n.pos[1] = float(self.pos[i, 1])
+            n.vel[0] = float(self.vel[i, 0])
+            n.vel[1] = float(self.vel[i, 1])
+            world.npc_hash.move(i, n.pos)
+
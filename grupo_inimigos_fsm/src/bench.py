@@ -0,0 +1,227 @@
+# bench.py
+# Headless benchmarks for the simulation hot paths at scaled entity counts.
+#   python bench.py                                  # all cases, 10..10000
+#   python bench.py --cases astar,steering --counts 10,100
+#   python bench.py --out new.json --compare old.json --tolerance 0.25
+# Exits with status 1 when --compare finds a case slower than the tolerance.
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from headless import HeadlessRunner, BotInput, new_game, _quiet
+from batch_steering import BatchSteering
+from steering import separation, cohesion, alignment, seek
+from config import SIM_HZ
+
+DT = 1.0 / SIM_HZ
+
+
+# ---------------------------------------
+# CASES
+# each setup(n) builds fresh state and returns a tick() callable
+# ---------------------------------------
+def setup_world_update(n):
+    runner = HeadlessRunner(seed=random.getrandbits(32), npc_count=n, inputs=BotInput())
+    player = runner.player
+
+    def tick():
+        player.hp = player.max_hp  # keep the match going
+        runner.step()
+    return tick
+
+
+def setup_npc_engage(n):
+    world, _ = new_game(npc_count=n)
+    world.broadcast_engage()
+    npcs = world.npcs
+    move = world.npc_hash.move
+
+    def tick():
+        world.perception.update(world)   # as World.update does first
+        if world.squads is not None:
+            world.squads.update()
+        for i, npc in enumerate(npcs):
+            npc.behavior_engage(DT)
+            move(i, npc.pos)
+    return tick
+
+
+def setup_astar(n):
+    # n uncached searches per tick (one per NPC replanning)
+    world, _ = new_game(npc_count=0)
+    free = [(x, y) for x in range(world.grid_w) for y in range(world.grid_h) if world.grid[x][y] == 0]
+    pairs = [(random.choice(free), random.choice(free)) for _ in range(n)]
+    pf = world.pathfinder
+
+    def tick():
+        pf.cache.clear()
+        for s, g in pairs:
+            world.astar(s, g)
+    return tick
+
+
+def setup_projectiles(n):
+    world, player = new_game(npc_count=100)
+    for i in range(n):
+        pos = [random.uniform(0, world.map_w), random.uniform(0, world.map_h)]
+        vel = [random.uniform(-400, 400), random.uniform(-400, 400)]
+        owner = player if i % 2 == 0 else world.npcs[0]
+        world.spawn_projectile(pos, vel, dmg=0, owner=owner)
+
+    def tick():
+        world.update_projectiles(DT)
+    return tick
+
+
+def setup_steering(n):
+    # reference per-object steering.py, neighbor lists precomputed
+    world, _ = new_game(npc_count=n)
+    npcs = world.npcs
+    neigh = [npc.neighbors() for npc in npcs]
+    target = world.player.pos
+
+    def tick():
+        for npc, ne in zip(npcs, neigh):
+            separation(npc, ne)
+            cohesion(npc, ne)
+            alignment(npc, ne)
+            seek(npc.pos, target, npc.max_speed)
+    return tick
+
+
+def setup_batch_steering(n):
+    world, _ = new_game(npc_count=n)
+    batch = BatchSteering()
+    batch.load(world.npcs)
+    rows = np.arange(n)
+    targets = np.tile(np.array(world.player.pos, dtype=np.float64), (n, 1))
+    w_coh = np.full(n, 0.35)
+
+    def tick():
+        batch.step(rows, targets, w_coh, DT, world.occupancy)
+    return tick
+
+
+CASES = {
+    "world_update": setup_world_update,
+    "npc_engage": setup_npc_engage,
+    "astar": setup_astar,
+    "projectiles": setup_projectiles,
+    "steering": setup_steering,
+    "batch_steering": setup_batch_steering,
+}
+
+
+# ---------------------------------------
+# RUNNER
+# ---------------------------------------
+def run_case(name, n, seed, min_ticks, budget):
+    with _quiet(True):
+        return _run_case(name, n, seed, min_ticks, budget)
+
+
+def _run_case(name, n, seed, min_ticks, budget):
+    random.seed(seed)
+    tick = CASES[name](n)
+    tick()  # warm-up
+    ticks = 0
+    t0 = time.perf_counter()
+    elapsed = 0.0
+    while ticks < min_ticks and (ticks == 0 or elapsed < budget):
+        tick()
+        ticks += 1
+        elapsed = time.perf_counter() - t0
+
+    # peak memory of setup + one tick, measured separately (tracemalloc is slow)
+    random.seed(seed)
+    tracemalloc.start()
+    CASES[name](n)()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ms = elapsed * 1000.0 / ticks
+    return {
+        "case": name,
+        "n": n,
+        "ticks": ticks,
+        "ms_per_tick": ms,
+        "ticks_per_sec": 1000.0 / ms if ms > 0 else float("inf"),
+        "peak_kb": peak / 1024.0,
+    }
+
+
+def compare(results, baseline, tolerance):
+    old = {(r["case"], r["n"]): r for r in baseline["results"]}
+    regressions = []
+    print()
+    print(f"{'case':<16}{'n':>7}{'old ms':>11}{'new ms':>11}{'ratio':>8}")
+    for r in results:
+        o = old.get((r["case"], r["n"]))
+        if o is None:
+            continue
+        ratio = r["ms_per_tick"] / o["ms_per_tick"] if o["ms_per_tick"] > 0 else 1.0
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(r)
+        print(f"{r['case']:<16}{r['n']:>7}{o['ms_per_tick']:>11.3f}{r['ms_per_tick']:>11.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the simulation hot paths.")
+    ap.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of: " + ", ".join(CASES))
+    ap.add_argument("--counts", default="10,100,1000,10000")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--ticks", type=int, default=30, help="timed ticks per case (fewer if over budget)")
+    ap.add_argument("--budget", type=float, default=3.0, help="seconds of timed ticks per case")
+    ap.add_argument("--skip-over", type=float, default=5000.0,
+                    help="skip larger counts of a case once a tick takes longer than this (ms)")
+    ap.add_argument("--out", help="write results as JSON")
+    ap.add_argument("--compare", help="JSON from a previous run to check for regressions")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio for --compare")
+    args = ap.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    for c in cases:
+        if c not in CASES:
+            ap.error(f"unknown case {c!r}")
+    counts = [int(c) for c in args.counts.split(",")]
+
+    results = []
+    print(f"{'case':<16}{'n':>7}{'ticks':>7}{'ms/tick':>11}{'ticks/s':>11}{'peak KB':>11}")
+    for name in cases:
+        for n in counts:
+            r = run_case(name, n, args.seed, args.ticks, args.budget)
+            results.append(r)
+            print(f"{name:<16}{n:>7}{r['ticks']:>7}{r['ms_per_tick']:>11.3f}"
+                  f"{r['ticks_per_sec']:>11.1f}{r['peak_kb']:>11.0f}", flush=True)
+            if r["ms_per_tick"] > args.skip_over:
+                print(f"{name:<16} skipping larger counts (over {args.skip_over:.0f} ms/tick)")
+                break
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# bench_astar.py
+# Microbenchmark: World.astar (pathfinding.PathFinder) vs the original
+# dict-based implementation (World.astar_reference).
+#   python bench_astar.py [queries] [seed]
+import random
+import sys
+import time
+
+from world import World
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    random.seed(seed)
+    world = World(960, 540)
+
+    free = [(x, y) for x in range(world.grid_w) for y in range(world.grid_h) if world.grid[x][y] == 0]
+    pairs = [(random.choice(free), random.choice(free)) for _ in range(queries)]
+
+    # correctness: same path lengths
+    for s, g in pairs:
+        a = world.astar_reference(s, g)
+        world.pathfinder.cache.clear()
+        b = world.astar(s, g)
+        if (a is None) != (b is None) or (a and len(a) != len(b)):
+            print("MISMATCH", s, g, a and len(a), b and len(b))
+            sys.exit(1)
+
+    t = time.perf_counter()
+    for s, g in pairs:
+        world.astar_reference(s, g)
+    t_ref = time.perf_counter() - t
+
+    # uncached search
+    pf = world.pathfinder
+    t = time.perf_counter()
+    for s, g in pairs:
+        pf._search(s, g)
+    t_flat = time.perf_counter() - t
+
+    # NPC-like load: many repeated (start, goal) pairs
+    pf.cache.clear()
+    hot = [random.choice(pairs) for _ in range(queries)]
+    hot = [p for p in hot[:queries // 20] for _ in range(20)]
+    t = time.perf_counter()
+    for s, g in hot:
+        world.astar(s, g)
+    t_cached = time.perf_counter() - t
+
+    print(f"queries: {queries}  grid: {world.grid_w}x{world.grid_h}")
+    print(f"reference   {t_ref * 1e6 / queries:9.1f} us/query")
+    print(f"flat        {t_flat * 1e6 / queries:9.1f} us/query  ({t_ref / t_flat:.1f}x)")
+    print(f"flat+cache  {t_cached * 1e6 / len(hot):9.1f} us/query  ({t_ref / t_cached * len(hot) / queries:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench_hpa.py
+# Hierarchical (hpa.HierarchicalPathFinder) vs full-grid A* on a large map
+# with random obstacles: time per query, nodes expanded, memory, and the
+# length of fully refined HPA* paths relative to the optimal ones.
+#   python bench_hpa.py [scale] [queries] [seed]     # scale 8 = 64x the default map area
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import mapdata
+from config import HPA_CLUSTER
+from world import World
+from pathfinding import PathFinder, grid_snapshot
+from hpa import HierarchicalPathFinder
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    # procedural map, unbaked: both finders build from the grid below
+    base = mapdata.load_map("default")
+    spec = mapdata.procedural(base.width * scale, base.height * scale, seed, base.tile)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.json")
+        with open(path, "w") as f:
+            json.dump(spec, f)
+        world = World(960, 540, path_workers=0, map_file=path)
+
+    random.seed(seed)
+    h = world.grid_h
+    free = [divmod(i, h) for i in world.free_cells.tolist()]
+    pairs = []
+    while len(pairs) < queries:
+        s, g = random.choice(free), random.choice(free)
+        if abs(s[0] - g[0]) + abs(s[1] - g[1]) > world.grid_w // 2:
+            pairs.append((s, g))
+
+    # build cost and resident memory of each structure
+    tracemalloc.start()
+    pf = PathFinder(world)
+    t = time.perf_counter()
+    pf._sync()
+    t_flat_build = time.perf_counter() - t
+    flat_mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    hpa = HierarchicalPathFinder(world)
+    t = time.perf_counter()
+    hpa.load(grid_snapshot(world))
+    t_hpa_build = time.perf_counter() - t
+    hpa_mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # the same graph from the map's baked tables (what World uses)
+    t = time.perf_counter()
+    HierarchicalPathFinder(world)._sync()
+    t_hpa_baked = time.perf_counter() - t
+
+    # full-grid A* (uncached)
+    t = time.perf_counter()
+    flat = [pf._search(s, g) for s, g in pairs]
+    t_flat = time.perf_counter() - t
+    flat_nodes = pf.expanded
+
+    # HPA* as NPCs use it: abstract search + the first crossings refined
+    # (build-time BFS not counted)
+    start_nodes = hpa.expanded
+    t = time.perf_counter()
+    for s, g in pairs:
+        hpa.find(s, g)
+    t_hpa = time.perf_counter() - t
+    hpa_nodes = hpa.expanded - start_nodes
+
+    # per-query scratch memory (separate pass: tracing slows the queries)
+    tracemalloc.start()
+    for s, g in pairs:
+        hpa.find(s, g)
+    hpa_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # quality: fully refined HPA* path length vs optimal
+    ratios = []
+    for (s, g), best in zip(pairs, flat):
+        path = hpa.find(s, g, legs=1 << 30)
+        if (path is None) != (best is None):
+            print("REACHABILITY MISMATCH", s, g)
+            sys.exit(1)
+        if best:
+            ratios.append(len(path) / len(best))
+
+    print(f"grid: {world.grid_w}x{world.grid_h} ({len(free)} free)  clusters: {HPA_CLUSTER}  "
+          f"entrances: {len(hpa.node_cell)}  queries: {queries}")
+    print(f"build       flat {t_flat_build * 1000:7.1f} ms {flat_mem / 1e6:6.2f} MB   "
+          f"hpa {t_hpa_build * 1000:7.1f} ms {hpa_mem / 1e6:6.2f} MB   (baked {t_hpa_baked * 1000:.1f} ms)")
+    print(f"flat A*     {t_flat * 1e6 / queries:9.1f} us/query  {flat_nodes / queries:8.0f} nodes/query")
+    print(f"HPA*        {t_hpa * 1e6 / queries:9.1f} us/query  {hpa_nodes / queries:8.0f} nodes/query  "
+          f"({t_flat / t_hpa:.1f}x, peak {hpa_peak / 1e3:.0f} KB)")
+    print(f"path length vs optimal: mean {sum(ratios) / len(ratios):.3f}  max {max(ratios):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench_startup.py
+# World construction on a baked map (mapdata.py) vs building the grid and
+# occupancy from the obstacle rects, on procedural maps of growing size.
+#   python bench_startup.py [scales...] [--seed N]      # default: 1 4 8
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pygame
+
+import mapdata
+from occupancy import Occupancy
+from world import World
+
+
+def ms(t):
+    return (time.perf_counter() - t) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("scales", nargs="*", type=int, default=[1, 4, 8])
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    base = mapdata.load_map("default")
+    print(f"{'grid':>9} {'rects':>6} {'per-tile':>9} {'bake':>8} {'nav KB':>7} {'load':>7} {'World()':>8} {'reset':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            spec = mapdata.procedural(base.width * scale, base.height * scale, args.seed, base.tile)
+            path = os.path.join(tmp, f"s{scale}.json")
+            with open(path, "w") as f:
+                json.dump(spec, f)
+            tile = spec["tile"]
+            gw = spec["width"] // tile
+            gh = spec["height"] // tile
+
+            # what World.__init__ used to do: occupancy + one test per tile
+            t = time.perf_counter()
+            occ = Occupancy([pygame.Rect(r) for r in spec["obstacles"]])
+            grid = [[1 if occ.contains((x * tile + tile / 2, y * tile + tile / 2)) else 0
+                     for y in range(gh)] for x in range(gw)]
+            t_old = ms(t)
+
+            t = time.perf_counter()
+            _, size = mapdata.bake_file(path)
+            t_bake = ms(t)
+
+            t = time.perf_counter()
+            mapdata.load_map(path)          # mmap + wrap (once per process)
+            t_load = ms(t)
+            t = time.perf_counter()
+            world = World(960, 540, path_workers=0, map_file=path)
+            t_world = ms(t)
+            assert world.grid == grid
+            t = time.perf_counter()
+            World(960, 540, path_workers=0, map_file=path)   # a new match: headless.new_game (main.main)
+            t_reset = ms(t)
+
+            print(f"{gw:>4}x{gh:<4} {len(spec['obstacles']):>6} {t_old:>7.1f}ms {t_bake:>6.0f}ms {size / 1e3:>7.0f} "
+                  f"{t_load:>5.1f}ms {t_world:>6.1f}ms {t_reset:>5.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,8 @@ VIEW_W = 960
 VIEW_H = 540
 FPS = 60
 
-MAP_W = 1280
-MAP_H = 720
+# map definition (maps/*.json, baked by mapdata.py); size comes from the map
+MAP_FILE = "maps/default.json"
 
 NPC_COUNT = 10
 
@@ -13,4 +13,61 @@ NPC_RADIUS = 18
 CHARGE_COOLDOWN = 3.0
 CHARGE_SPEED = 420
 DETECTION_RANGE = 380
+MELEE_RANGE = 22
+CHARGE_MIN_RANGE = 70     # charge only from farther than this
+SHOOT_RANGE = 420
 PATH_REPLAN_INTERVAL = 0.6
+
+# neighbor queries (spatial hash cell = query radius)
+NEIGHBOR_RADIUS = 140
+NEIGHBOR_CELL = 140
+
+# move engaged NPCs with the numpy batch engine (batch_steering.py)
+BATCH_STEERING = False
+
+# engaged NPCs path toward the player through one shared flow field
+# (maps below HPA_MIN_CELLS; larger ones use per-NPC HPA* paths)
+FLOW_FIELD = True
+
+# fixed-step simulation (main.py): sim rate, catch-up cap, longest frame
+SIM_HZ = 60
+MAX_SIM_STEPS = 5
+MAX_FRAME_DT = 0.25
+
+# AI level of detail: full rate on screen (camera rect + LOD_VIEW_MARGIN
+# px) or within LOD_NEAR px of the player, reduced beyond it and again
+# beyond LOD_FAR
+LOD_ENABLED = True
+LOD_NEAR = 600
+LOD_FAR = 1000
+LOD_VIEW_MARGIN = 64
+
+# A* replans go through World.path_queue, at most this many nodes per tick
+# (only used without a flow field)
+PATH_QUEUE = True
+PATH_NODE_BUDGET = 1500
+
+# A* in a process pool over a grid snapshot (only used without a flow
+# field; takes precedence over PATH_QUEUE). 0 workers = solve synchronously
+PATH_ASYNC = False
+PATH_WORKERS = 2
+
+# hierarchical pathfinding (hpa.py) on grids with at least HPA_MIN_CELLS
+# tiles: cluster size in tiles, cluster crossings refined per query
+HPA_MIN_CELLS = 20000
+HPA_CLUSTER = 16
+HPA_LEGS = 2
+
+# line of sight (los.py): tile pairs cached before the cache is reset
+LOS_CACHE_SIZE = 65536
+
+# squads (squads.py): allies within SQUAD_RADIUS of a leader flock toward
+# their squad's aggregates and retreat together when one of them dies;
+# regrouped every SQUAD_REGROUP ticks, at most SQUAD_MAX members. Off =
+# neighbor-list flocking and world-wide broadcasts
+SQUADS = True
+SQUAD_RADIUS = 140
+SQUAD_MAX = 8
+SQUAD_REGROUP = 30
+# spotting the player also alerts the spotter's whole squad (new gameplay)
+SQUAD_ALERT = False
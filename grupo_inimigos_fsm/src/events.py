@@ -0,0 +1,64 @@
+# events.py
+# World.events: FSM events queued during the tick and delivered in one batch
+# at its end. Events raised while delivering (e.g. the health re-check on
+# entering a state) wait for the next dispatch. With World.squads a death
+# makes its squad retreat (and, with SQUAD_ALERT, spotting the player
+# alerts the spotter's squad); without, a death reaches everyone.
+from fsm import ALLY_DIED, PLAYER_IN_RANGE, PATROL
+from config import SQUAD_ALERT
+
+
+class EventBus:
+    def __init__(self, world):
+        self.world = world
+        self.queue = []          # (event, npc)
+        self.squad_alert = SQUAD_ALERT
+        self.delivered = 0       # stats
+
+    def emit(self, event, npc):
+        self.queue.append((event, npc))
+
+    def detect_player(self):
+        # patrolling NPCs inside detection range (from this tick's
+        # perception table) with a clear line of sight (one batched query)
+        world = self.world
+        npcs = world.npcs
+        patrol = [npcs[i] for i in world.perception.detected if npcs[i].fsm.current is PATROL]
+        if not patrol:
+            return
+        for n, seen in zip(patrol, world.los.player_visibility(patrol)):
+            if seen:
+                self.queue.append((PLAYER_IN_RANGE, n))
+
+    def dispatch(self):
+        queue = self.queue
+        if not queue:
+            return
+        self.queue = []
+        squads = self.world.squads
+        alert = self.squad_alert and squads is not None
+        broadcast = False
+        alerted = set()    # squads, each notified once however many events
+        bereaved = set()
+        for event, npc in queue:
+            if event is ALLY_DIED:
+                if squads is None:
+                    # any number of deaths this tick -> one O(N) broadcast
+                    broadcast = True
+                else:
+                    bereaved.add(squads.squad_of(npc))
+            elif npc.alive:
+                npc.fsm.handle(event)
+                if event is PLAYER_IN_RANGE and alert:
+                    alerted.add(squads.squad_of(npc))
+        if broadcast:
+            for n in self.world.npcs:
+                if n.alive:
+                    n.fsm.handle(ALLY_DIED)
+        alerted.discard(-1)
+        bereaved.discard(-1)
+        for s in sorted(alerted):
+            squads.notify(s, PLAYER_IN_RANGE)
+        for s in sorted(bereaved):
+            squads.notify(s, ALLY_DIED)
+        self.delivered += len(queue)
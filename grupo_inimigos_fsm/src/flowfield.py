@@ -0,0 +1,97 @@
+# flowfield.py
+# Dijkstra map (BFS, uniform cost) from a single goal tile over World.grid.
+# Computed once per goal change; every NPC then reads its next tile in O(1).
+from collections import deque
+
+DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+
+
+class FlowField:
+    def __init__(self, world):
+        self.world = world
+        self.goal = None
+        n = world.grid_w * world.grid_h
+        self.dist = [-1] * n
+        self.next = [-1] * n
+        self.builds = 0
+
+    def set_goal(self, goal):
+        # no-op while the goal tile doesn't change
+        if goal == self.goal:
+            return
+        self.goal = goal
+        self._build()
+
+    def invalidate(self):
+        # obstacles changed: rebuild on the next set_goal
+        self.goal = None
+
+    def _build(self):
+        w = self.world.grid_w
+        h = self.world.grid_h
+        grid = self.world.grid
+        n = w * h
+        dist = [-1] * n
+        nxt = [-1] * n
+        self.dist = dist
+        self.next = nxt
+        self.builds += 1
+
+        gx, gy = self.goal
+        if not (0 <= gx < w and 0 <= gy < h) or grid[gx][gy] == 1:
+            return
+
+        g = gx * h + gy
+        dist[g] = 0
+        q = deque([(gx, gy)])
+        while q:
+            x, y = q.popleft()
+            i = x * h + y
+            d = dist[i] + 1
+            for dx, dy in DIRS:
+                nx, ny = x + dx, y + dy
+                if nx < 0 or ny < 0 or nx >= w or ny >= h:
+                    continue
+                j = nx * h + ny
+                if dist[j] != -1 or grid[nx][ny] == 1:
+                    continue
+                dist[j] = d
+                nxt[j] = i
+                q.append((nx, ny))
+
+        # blocked tiles (an NPC can stand on the edge of one) step out to
+        # their closest free neighbor, as A* does from a blocked start
+        for x in range(w):
+            col = grid[x]
+            for y in range(h):
+                if col[y] != 1:
+                    continue
+                best = -1
+                for dx, dy in DIRS:
+                    nx, ny = x + dx, y + dy
+                    if nx < 0 or ny < 0 or nx >= w or ny >= h or grid[nx][ny] == 1:
+                        continue
+                    j = nx * h + ny
+                    if dist[j] >= 0 and (best < 0 or dist[j] < dist[best]):
+                        best = j
+                if best >= 0:
+                    dist[x * h + y] = dist[best] + 1
+                    nxt[x * h + y] = best
+
+    def next_step(self, cell):
+        # tile to move to from `cell`, or None (at goal / unreachable)
+        x, y = cell
+        h = self.world.grid_h
+        if x < 0 or y < 0 or x >= self.world.grid_w or y >= h:
+            return None
+        j = self.next[x * h + y]
+        if j < 0:
+            return None
+        return (j // h, j % h)
+
+    def distance(self, cell):
+        x, y = cell
+        h = self.world.grid_h
+        if x < 0 or y < 0 or x >= self.world.grid_w or y >= h:
+            return -1
+        return self.dist[x * h + y]
@@ -1,30 +1,57 @@
+# States are stateless singletons: update() only runs the behavior, and
+# transitions happen when World.events delivers an event (see TRANSITIONS).
+
+# events
+PLAYER_IN_RANGE = "player_in_range"
+HEALTH = "health"          # damaged or healed (also re-checked on entering a state)
+ALLY_DIED = "ally_died"
+
 class State:
+    __slots__ = ()
     def enter(self, npc): pass
     def exit(self, npc): pass
     def update(self, npc, dt): pass
 
 class Patrol(State):
+    __slots__ = ()
     def update(self, npc, dt):
         npc.behavior_patrol(dt)
-        if npc.can_see_player():
-            npc.fsm.change(Engage())
 
 class Engage(State):
+    __slots__ = ()
     def update(self, npc, dt):
         npc.behavior_engage(dt)
-        if npc.health < 30:
-            npc.fsm.change(Retreat())
 
 class Retreat(State):
+    __slots__ = ()
     def update(self, npc, dt):
         npc.behavior_retreat(dt)
-        if npc.health > 70:
-            npc.fsm.change(Patrol())
 
 class Dead(State):
-    pass
+    __slots__ = ()
+
+PATROL = Patrol()
+ENGAGE = Engage()
+RETREAT = Retreat()
+DEAD = Dead()
+
+def low_health(npc):
+    return npc.health < 30
+
+def recovered(npc):
+    return npc.health > 70
+
+# (state, event) -> (guard or None, next state); state None = any state
+TRANSITIONS = {
+    (PATROL, PLAYER_IN_RANGE): (None, ENGAGE),
+    (ENGAGE, HEALTH): (low_health, RETREAT),
+    (RETREAT, HEALTH): (recovered, PATROL),
+    (None, ALLY_DIED): (None, RETREAT),
+}
 
 class FSM:
+    __slots__ = ("npc", "current")
+
     def __init__(self, npc):
         self.npc = npc
         self.current = None
@@ -34,6 +61,21 @@ class FSM:
             self.current.exit(self.npc)
         self.current = new_state
         self.current.enter(self.npc)
+        # health may already be past the new state's threshold
+        if (new_state, HEALTH) in TRANSITIONS:
+            self.npc.world.events.emit(HEALTH, self.npc)
+
+    def handle(self, event):
+        t = TRANSITIONS.get((self.current, event))
+        if t is None:
+            t = TRANSITIONS.get((None, event))
+            if t is None:
+                return False
+        guard, target = t
+        if guard is not None and not guard(self.npc):
+            return False
+        self.change(target)
+        return True
 
     def update(self, dt):
         if self.current:
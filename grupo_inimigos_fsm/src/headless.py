@@ -0,0 +1,169 @@
+# headless.py
+# Steps World/Player/NPCs with a fixed dt and no display, for soak tests,
+# benchmarks and CI. Player input comes from an input source instead of
+# pygame.key.get_pressed() / pygame.mouse.
+#   python headless.py --ticks 3600 --npcs 50 --seed 1 --bot
+import argparse
+import contextlib
+import os
+import random
+import time
+
+import pygame
+
+import snapshot
+from world import World
+from player import Player
+from config import VIEW_W, VIEW_H, SIM_HZ, NPC_COUNT, PATH_WORKERS
+from utils import distance
+
+
+class Keys:
+    # stand-in for pygame.key.get_pressed(): indexable by pygame.K_* codes
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+NO_KEYS = Keys()
+
+
+class NullInput:
+    # player stands still and never fires
+    def poll(self, tick, world, player):
+        return NO_KEYS, player.pos, False
+
+
+class ScriptedInput:
+    # frames: list of (keys, mouse_world, fire), one per tick (the last one
+    # repeats), or a callable(tick, world, player) returning the same tuple
+    def __init__(self, frames):
+        self.frames = frames
+
+    def poll(self, tick, world, player):
+        if callable(self.frames):
+            keys, mouse, fire = self.frames(tick, world, player)
+        elif not self.frames:
+            return NO_KEYS, player.pos, False
+        else:
+            keys, mouse, fire = self.frames[min(tick, len(self.frames) - 1)]
+        if not isinstance(keys, Keys):
+            keys = Keys(keys)
+        return keys, mouse, fire
+
+
+class BotInput:
+    # simple scripted player: backs away from the closest enemy and shoots it
+    def __init__(self, emp_range=120):
+        self.emp_range = emp_range
+
+    def poll(self, tick, world, player):
+        target = None
+        best = 0.0
+        for n in world.npcs:
+            if n.alive:
+                d = distance(player.pos, n.pos)
+                if target is None or d < best:
+                    target, best = n, d
+        if target is None:
+            return NO_KEYS, player.pos, False
+
+        pressed = []
+        dx = player.pos[0] - target.pos[0]
+        dy = player.pos[1] - target.pos[1]
+        if abs(dx) > 4:
+            pressed.append(pygame.K_d if dx > 0 else pygame.K_a)
+        if abs(dy) > 4:
+            pressed.append(pygame.K_s if dy > 0 else pygame.K_w)
+        if best < self.emp_range:
+            pressed.append(pygame.K_e)
+        return Keys(pressed), target.pos[:], True
+
+
+def new_game(seed=None, npc_count=NPC_COUNT, path_workers=PATH_WORKERS):
+    # world + player + NPC group; seeds the global RNG first when given a seed
+    if seed is not None:
+        random.seed(seed)
+    world = World(VIEW_W, VIEW_H, path_workers)
+    player = Player(world)
+    world.add_player(player)
+    world.spawn_group(npc_count)
+    return world, player
+
+
+class HeadlessRunner:
+    def __init__(self, seed=0, npc_count=NPC_COUNT, dt=1.0 / SIM_HZ, inputs=None, quiet=True):
+        self.seed = seed
+        self.dt = dt
+        self.inputs = inputs if inputs is not None else NullInput()
+        self.quiet = quiet
+        # paths solved synchronously so a seed always replays the same run
+        self.world, self.player = new_game(seed, npc_count, path_workers=0)
+        self.tick = 0
+
+    def step(self):
+        world, player = self.world, self.player
+        keys, mouse, fire = self.inputs.poll(self.tick, world, player)
+        # sources may set .camera (replays); otherwise the camera sits at the
+        # view center, so screen mouse == world mouse
+        cam = getattr(self.inputs, "camera", None)
+        if cam is None:
+            cam = (world.view_w // 2, world.view_h // 2)
+        player.update(self.dt, keys, mouse, cam[0], cam[1], (fire, False, False))
+        world.update(self.dt)
+        self.tick += 1
+
+    def save_state(self):
+        # (tick, snapshot buffer): cheap rollback / branching point
+        return self.tick, snapshot.save(self.world, self.player)
+
+    def load_state(self, state):
+        self.tick, buf = state
+        snapshot.restore(self.world, self.player, buf)
+
+    def run(self, ticks, stop_on_death=True):
+        # returns the number of ticks actually simulated
+        start = self.tick
+        with _quiet(self.quiet):
+            for _ in range(ticks):
+                if stop_on_death and not self.player.alive:
+                    break
+                self.step()
+        return self.tick - start
+
+
+@contextlib.contextmanager
+def _quiet(enabled):
+    # the game prints on every dash/EMP/shot; drop that output when headless
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        yield
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the simulation without a display.")
+    ap.add_argument("--ticks", type=int, default=3600)
+    ap.add_argument("--npcs", type=int, default=NPC_COUNT)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dt", type=float, default=1.0 / SIM_HZ)
+    ap.add_argument("--bot", action="store_true", help="scripted player instead of a still one")
+    args = ap.parse_args()
+
+    runner = HeadlessRunner(args.seed, args.npcs, args.dt, BotInput() if args.bot else None)
+    t = time.perf_counter()
+    ticks = runner.run(args.ticks)
+    elapsed = time.perf_counter() - t
+
+    alive = sum(1 for n in runner.world.npcs if n.alive)
+    sim_time = ticks * args.dt
+    print(f"ticks: {ticks}  elapsed: {elapsed:.3f}s  ticks/s: {ticks / max(elapsed, 1e-9):.0f}  "
+          f"speedup: {sim_time / max(elapsed, 1e-9):.1f}x real time")
+    print(f"player hp: {runner.player.hp:.1f}  npcs alive: {alive}/{len(runner.world.npcs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+# hpa.py
+# Hierarchical pathfinding (HPA*) over World.grid for large maps. The grid is
+# split into CLUSTER x CLUSTER tile clusters. Entrances are free cell pairs
+# on the shared borders; distances between the entrances of a cluster are
+# precomputed. A query connects start/goal to their cluster's entrances,
+# searches the small abstract graph, then refines only the first `legs`
+# cluster crossings into tiles. The returned path can therefore end short of
+# the goal; NPCs plan the next leg when they reach its end. Baked maps
+# (mapdata.py) carry the entrance graph, loaded instead of rebuilt.
+# Each entrance keeps its in-cluster BFS tree (distances + a step back per
+# cell, built on first use), so a query reads the start/goal costs and the
+# refined tiles from those trees: no per-query BFS outside a single cluster.
+import heapq
+from array import array
+from collections import deque
+
+from pathfinding import grid_snapshot
+from config import HPA_CLUSTER, HPA_LEGS
+
+START = -1
+GOAL = -2
+UNREACHED = 0xFFFF
+
+
+class HierarchicalPathFinder:
+    def __init__(self, world, cluster=HPA_CLUSTER, legs=HPA_LEGS):
+        self.world = world
+        self.cluster = cluster
+        self.legs = legs
+        self.version = None
+
+        # stats
+        self.calls = 0
+        self.expanded = 0      # abstract + local search nodes
+
+    # ---------------------------------------
+    # BUILD
+    # ---------------------------------------
+    def _sync(self):
+        world = self.world
+        if world is None or self.version == world.grid_version:
+            return
+        baked = world.baked
+        if baked is not None and baked.hpa_cluster == self.cluster:
+            self.load_tables(grid_snapshot(world), *baked.hpa_tables)
+        else:
+            self.load(grid_snapshot(world))
+
+    def _reset(self, snap):
+        self.version = snap.version
+        self.w = snap.w
+        self.h = snap.h
+        self.blocked = snap.blocked
+        self.node_cell = []    # node id -> flat cell index
+        self.node_x = []       # node id -> tile coords (heuristic)
+        self.node_y = []
+        self.cell_node = {}    # flat cell index -> node id
+        self.edges = []        # node id -> list of (node id, cost)
+        self.cluster_nodes = {}
+        self.trees = {}        # node id -> its in-cluster BFS tree (_tree)
+        # abstract search state, sized on first search
+        self.g = []
+        self.parent = []
+        self.stamp = []
+        self.closed = []
+        self.gen = 0
+
+    def load(self, snap):
+        self._reset(snap)
+        self._find_entrances()
+        self._link_clusters()
+
+    def tables(self):
+        # entrance graph as flat int lists: node cells + CSR edges
+        offsets = [0]
+        targets = []
+        costs = []
+        for e in self.edges:
+            for m, d in e:
+                targets.append(m)
+                costs.append(d)
+            offsets.append(len(targets))
+        return self.node_cell, offsets, targets, costs
+
+    def load_tables(self, snap, node_cell, offsets, targets, costs):
+        # same nodes and edge order as load() on this grid would produce
+        self._reset(snap)
+        for i in node_cell:
+            self._node(i)
+        edges = self.edges
+        for n in range(len(node_cell)):
+            a, b = offsets[n], offsets[n + 1]
+            edges[n] = list(zip(targets[a:b], costs[a:b]))
+
+    def _node(self, i):
+        n = self.cell_node.get(i)
+        if n is None:
+            n = self.cell_node[i] = len(self.node_cell)
+            self.node_cell.append(i)
+            self.node_x.append(i // self.h)
+            self.node_y.append(i % self.h)
+            self.edges.append([])
+            self.cluster_nodes.setdefault(self.cluster_of(i), []).append(n)
+        return n
+
+    def _entrance(self, a, b):
+        na = self._node(a)
+        nb = self._node(b)
+        self.edges[na].append((nb, 1))
+        self.edges[nb].append((na, 1))
+
+    def _find_entrances(self):
+        # runs of free cell pairs along each border: one entrance in the
+        # middle of short runs, one at each end of long ones
+        w, h, c, blocked = self.w, self.h, self.cluster, self.blocked
+        for x in range(c, w, c):          # vertical borders between x-1 and x
+            self._scan_border([((x - 1) * h + y, x * h + y) for y in range(h)])
+        for y in range(c, h, c):          # horizontal borders between y-1 and y
+            self._scan_border([(x * h + y - 1, x * h + y) for x in range(w)])
+
+    def _scan_border(self, pairs):
+        c, blocked = self.cluster, self.blocked
+        run = []
+        for k, (a, b) in enumerate(pairs):
+            # runs never span two clusters along the border
+            if run and k % c == 0:
+                self._place(run)
+                run = []
+            if blocked[a] or blocked[b]:
+                if run:
+                    self._place(run)
+                    run = []
+            else:
+                run.append((a, b))
+        if run:
+            self._place(run)
+
+    def _place(self, run):
+        if len(run) < 6:
+            self._entrance(*run[len(run) // 2])
+        else:
+            self._entrance(*run[0])
+            self._entrance(*run[-1])
+
+    def _link_clusters(self):
+        # intra-cluster distances between every pair of entrances
+        for nodes in self.cluster_nodes.values():
+            for n in nodes:
+                for m, d in self._tree(n)[2].items():
+                    if m != n:
+                        self.edges[n].append((m, d))
+
+    # ---------------------------------------
+    # LOCAL SEARCH
+    # ---------------------------------------
+    def cluster_of(self, i):
+        return (i // self.h // self.cluster, i % self.h // self.cluster)
+
+    def _local(self, i):
+        # index of cell i inside its cluster
+        c = self.cluster
+        x, y = divmod(i, self.h)
+        return x % c * c + y % c
+
+    def _tree(self, n):
+        # BFS from entrance n without leaving its cluster, kept until the
+        # grid changes: (back, dist, costs) per local cell, back = code of
+        # the step toward the entrance, dist = UNREACHED if not reachable;
+        # costs = {entrance of the cluster: distance}
+        tree = self.trees.get(n)
+        if tree is not None:
+            return tree
+        c, h, blocked = self.cluster, self.h, self.blocked
+        src = self.node_cell[n]
+        key = self.cluster_of(src)
+        x0 = key[0] * c
+        y0 = key[1] * c
+        x1 = min(self.w, x0 + c)
+        y1 = min(h, y0 + c)
+        base = x0 * c + y0        # local index = x * c + y - base
+        dist = array("H", [UNREACHED]) * (c * c)
+        back = bytearray(c * c)
+        dist[self._local(src)] = 0
+        q = deque([src])
+        reached = 1
+        while q:
+            i = q.popleft()
+            x, y = divmod(i, h)
+            l = x * c + y - base
+            d = dist[l] + 1
+            if x + 1 < x1 and dist[l + c] == UNREACHED and not blocked[i + h]:
+                dist[l + c] = d
+                back[l + c] = 1
+                q.append(i + h)
+            if x > x0 and dist[l - c] == UNREACHED and not blocked[i - h]:
+                dist[l - c] = d
+                back[l - c] = 2
+                q.append(i - h)
+            if y + 1 < y1 and dist[l + 1] == UNREACHED and not blocked[i + 1]:
+                dist[l + 1] = d
+                back[l + 1] = 3
+                q.append(i + 1)
+            if y > y0 and dist[l - 1] == UNREACHED and not blocked[i - 1]:
+                dist[l - 1] = d
+                back[l - 1] = 4
+                q.append(i - 1)
+            reached += 1
+        self.expanded += reached
+        node_cell = self.node_cell
+        costs = {}
+        for m in self.cluster_nodes[key]:
+            d = dist[self._local(node_cell[m])]
+            if d != UNREACHED:
+                costs[m] = d
+        tree = self.trees[n] = (back, dist, costs)
+        return tree
+
+    def _walk(self, n, i):
+        # cells after i up to and including entrance n, along n's tree (i in
+        # n's cluster); None if n can't be reached from i
+        back = self._tree(n)[0]
+        h = self.h
+        steps = (0, -h, h, -1, 1)
+        src = self.node_cell[n]
+        cells = []
+        while i != src:
+            code = back[self._local(i)]
+            if not code:
+                return None
+            i += steps[code]
+            cells.append(i)
+        return cells
+
+    def _local_path(self, a, b):
+        # cells after a up to and including b, without leaving their
+        # (shared) cluster; a one-off BFS, for start and goal in one cluster
+        c, h, blocked = self.cluster, self.h, self.blocked
+        key = self.cluster_of(a)
+        x0 = key[0] * c
+        y0 = key[1] * c
+        x1 = min(self.w, x0 + c)
+        y1 = min(h, y0 + c)
+        parent = {a: -1}
+        q = deque([a])
+        while q:
+            i = q.popleft()
+            if i == b:
+                break
+            x, y = divmod(i, h)
+            for j, ok in ((i + h, x + 1 < x1), (i - h, x > x0), (i + 1, y + 1 < y1), (i - 1, y > y0)):
+                if ok and j not in parent and not blocked[j]:
+                    parent[j] = i
+                    q.append(j)
+        self.expanded += len(parent)
+        if b not in parent:
+            return None
+        cells = []
+        while b != a:
+            cells.append(b)
+            b = parent[b]
+        cells.reverse()
+        return cells
+
+    # ---------------------------------------
+    # QUERY
+    # ---------------------------------------
+    def find(self, start, goal, legs=None):
+        # list of (x, y) from start toward goal (the goal itself when it is
+        # within `legs` cluster crossings), or None if unreachable
+        self._sync()
+        self.calls += 1
+        w, h = self.w, self.h
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= gx < w and 0 <= gy < h) or not (0 <= sx < w and 0 <= sy < h):
+            return None
+        gi = gx * h + gy
+        if self.blocked[gi]:
+            return None
+        si = sx * h + sy
+        legs = self.legs if legs is None else legs
+        if not self.blocked[si]:
+            cells = self._find(si, gi, legs)
+        else:
+            # standing on a blocked tile (its center is inside an obstacle):
+            # step off to a free neighbor first, as the flat search does
+            cells = None
+            for j, ok in ((si + h, sx + 1 < w), (si - h, sx > 0), (si + 1, sy + 1 < h), (si - 1, sy > 0)):
+                if ok and not self.blocked[j]:
+                    cells = self._find(j, gi, legs)
+                    if cells is not None:
+                        cells.insert(0, si)
+                        break
+        return None if cells is None else self._tiles(cells)
+
+    def _find(self, si, gi, legs):
+        skey = self.cluster_of(si)
+        gkey = self.cluster_of(gi)
+
+        # same cluster and connected inside it: plain local path
+        if skey == gkey:
+            cells = self._local_path(si, gi)
+            if cells is not None:
+                return [si] + cells
+
+        # start/goal -> entrances of their clusters, read off the entrance trees
+        ls = self._local(si)
+        lg = self._local(gi)
+        start_edges = []
+        goal_cost = {}
+        for n in self.cluster_nodes.get(skey, ()):
+            d = self._tree(n)[1][ls]
+            if d != UNREACHED:
+                start_edges.append((n, d))
+        for n in self.cluster_nodes.get(gkey, ()):
+            d = self._tree(n)[1][lg]
+            if d != UNREACHED:
+                goal_cost[n] = d
+
+        abstract = self._search(start_edges, goal_cost, gi // self.h, gi % self.h)
+        if abstract is None:
+            return None
+        return self._refine(si, gi, abstract, legs)
+
+    def _search(self, start_edges, goal_cost, gx, gy):
+        # A* over entrance nodes; returns [n1, ..., nk] (start/goal implicit).
+        # g/parent are valid where stamp == gen (as in PathFinder)
+        node_x = self.node_x
+        node_y = self.node_y
+        edges = self.edges
+        if len(self.stamp) != len(node_x):
+            n = len(node_x)
+            self.g = [0] * n
+            self.parent = [0] * n
+            self.stamp = [0] * n
+            self.closed = [0] * n
+        self.gen += 1
+        gen = self.gen
+        g = self.g
+        parent = self.parent
+        stamp = self.stamp
+        closed = self.closed
+        push = heapq.heappush
+        pop = heapq.heappop
+        openh = []
+        for n, d in start_edges:
+            if stamp[n] != gen or d < g[n]:
+                stamp[n] = gen
+                g[n] = d
+                parent[n] = START
+                hn = abs(node_x[n] - gx) + abs(node_y[n] - gy)
+                push(openh, (d + hn, hn, n))
+        best = None
+        best_cost = 1 << 30
+        expanded = 0
+        while openh:
+            f, _, n = pop(openh)
+            if f >= best_cost:
+                break
+            if closed[n] == gen:
+                continue
+            closed[n] = gen
+            expanded += 1
+            gn = g[n]
+            d = goal_cost.get(n)
+            if d is not None and gn + d < best_cost:
+                best, best_cost = n, gn + d
+            # Manhattan is consistent here (edge costs are tile distances),
+            # so a closed node never improves
+            for m, cost in edges[n]:
+                ng = gn + cost
+                if stamp[m] != gen or ng < g[m]:
+                    stamp[m] = gen
+                    g[m] = ng
+                    parent[m] = n
+                    hm = abs(node_x[m] - gx) + abs(node_y[m] - gy)
+                    push(openh, (ng + hm, hm, m))
+        self.expanded += expanded
+        if best is None:
+            return None
+        path = []
+        n = best
+        while n != START:
+            path.append(n)
+            n = parent[n]
+        path.reverse()
+        return path
+
+    def _refine(self, si, gi, abstract, legs):
+        # cells for the first `legs` cluster crossings only
+        cells = [si]
+        cur = si
+        crossings = 0
+        for n in abstract:
+            nxt = self.node_cell[n]
+            if self.cluster_of(nxt) == self.cluster_of(cur):
+                seg = self._walk(n, cur)
+                if seg is None:
+                    return None
+                cells.extend(seg)
+            else:
+                if crossings == legs:
+                    return cells
+                crossings += 1
+                cells.append(nxt)
+            cur = nxt
+        # last entrance -> goal: its tree walked from the goal, reversed
+        if gi != cur:
+            seg = self._walk(n, gi)
+            if seg is None:
+                return None
+            seg.pop()
+            seg.reverse()
+            seg.append(gi)
+            cells.extend(seg)
+        return cells
+
+    def _tiles(self, cells):
+        h = self.h
+        return [(i // h, i % h) for i in cells]
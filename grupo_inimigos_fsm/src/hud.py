@@ -1,14 +1,15 @@
 # hud.py
 import pygame
+from render import texts
 
 def draw_hud(screen, world, player):
-    font = pygame.font.SysFont(None, 20)
+    # text surfaces are cached per slot and re-rendered only when they change
 
     # panel
     pygame.draw.rect(screen, (20,20,20), (8,8,260,110))
 
     # HP text
-    hp_text = font.render(f"HP: {int(player.hp)} / {player.max_hp}", True, (255,255,255))
+    hp_text = texts.get("hp", f"HP: {int(player.hp)} / {player.max_hp}", 20, (255,255,255))
     screen.blit(hp_text, (16, 12))
 
     # HP bar
@@ -24,13 +25,38 @@ def draw_hud(screen, world, player):
     pygame.draw.rect(screen, color, (bar_x, bar_y, int(bar_w*pct), bar_h))
 
     # cooldowns
-    dash = font.render(f"Dash: {player.dash_cd:.1f}s", True, (200,200,200))
-    emp = font.render(f"EMP: {player.emp_cd:.1f}s", True, (200,200,200))
-    shoot = font.render(f"Shoot: {player.shoot_cd:.2f}s", True, (200,200,200))
+    dash = texts.get("dash", f"Dash: {player.dash_cd:.1f}s", 20, (200,200,200))
+    emp = texts.get("emp", f"EMP: {player.emp_cd:.1f}s", 20, (200,200,200))
+    shoot = texts.get("shoot", f"Shoot: {player.shoot_cd:.2f}s", 20, (200,200,200))
     screen.blit(dash, (16, 56))
     screen.blit(emp, (16, 76))
     screen.blit(shoot, (16, 96))
 
     alive = sum(1 for n in world.npcs if n.alive)
-    txt = font.render(f"Inimigos vivos: {alive}/{len(world.npcs)}", True, (255,255,255))
+    txt = texts.get("alive", f"Inimigos vivos: {alive}/{len(world.npcs)}", 20, (255,255,255))
     screen.blit(txt, (280, 12))
+
+
+# ---------------------------------------
+# PERFORMANCE OVERLAY (F3)
+# ---------------------------------------
+PERF_PHASES = ["player", "perception", "squads", "npcs", "flow", "astar", "projectiles", "hearts", "events", "draw", "flip"]
+PERF_COUNTERS = ["sim_steps", "npc_updates", "astar_calls", "astar_nodes", "path_queue", "neighbor_queries", "proj_checks", "flow_builds", "hpa_calls", "fsm_events", "los_traces"]
+
+def draw_perf(screen, prof):
+    lines = [
+        f"frame avg {prof.frame_avg():5.2f} ms   p99 {prof.frame_p99():5.2f} ms",
+    ]
+    for name in PERF_PHASES:
+        if name in prof.history:
+            lines.append(f"{name:<12} {prof.average(name):6.2f} ms")
+    for name in PERF_COUNTERS:
+        if name in prof.history:
+            lines.append(f"{name:<16} {prof.average(name):8.1f} /frame")
+
+    w = 250
+    h = 8 + 16 * len(lines)
+    x = screen.get_width() - w - 8
+    pygame.draw.rect(screen, (20,20,20), (x, 8, w, h))
+    for i, line in enumerate(lines):
+        screen.blit(texts.get(("perf", i), line, 18, (200,230,200)), (x + 8, 12 + 16 * i))
@@ -0,0 +1,59 @@
+# lod.py
+# AI level of detail: NPCs off screen and away from the player run their
+# FSM + steering every 2nd/4th/8th tick with the dt accumulated in between.
+# Updates are staggered by NPC index so each tick does a similar amount of
+# work.
+from fsm import Patrol
+from config import LOD_NEAR, LOD_FAR, LOD_VIEW_MARGIN
+
+
+class LodScheduler:
+    def __init__(self, near=LOD_NEAR, far=LOD_FAR, margin=LOD_VIEW_MARGIN):
+        self.near2 = near * near
+        self.far2 = far * far
+        self.margin = margin
+        self.tick = 0
+        self.view = (0, 0, 0, 0)
+
+    def set_view(self, world):
+        # the camera rect main.py draws (clamped at the map edges, so it can
+        # be far from the player) plus a margin
+        cx, cy = world.camera_center(world.player.pos)
+        m = self.margin
+        self.view = (cx - world.view_w // 2 - m, cy - world.view_h // 2 - m,
+                     cx + world.view_w // 2 + m, cy + world.view_h // 2 + m)
+
+    def period(self, npc, d2):
+        # on screen / near the player: full rate, whatever the state
+        if d2 < self.near2:
+            return 1
+        x0, y0, x1, y1 = self.view
+        x, y = npc.pos
+        if x0 <= x <= x1 and y0 <= y <= y1:
+            return 1
+        patrol = isinstance(npc.fsm.current, Patrol)
+        if d2 < self.far2:
+            return 4 if patrol else 2
+        return 8 if patrol else 4
+
+    def update(self, world, dt):
+        self.tick += 1
+        tick = self.tick
+        self.set_view(world)
+        move = world.npc_hash.move
+        alive = world.perception.alive
+        d2 = world.perception.d2
+        updated = 0
+        for i, n in enumerate(world.npcs):
+            if not alive[i]:
+                continue
+            n.lod_dt += dt
+            period = self.period(n, d2[i])
+            if period > 1 and (tick + i) % period:
+                continue
+            step = n.lod_dt
+            n.lod_dt = 0.0
+            n.update(step)
+            move(i, n.pos)
+            updated += 1
+        world.npc_updates += updated
@@ -0,0 +1,154 @@
+# los.py
+# Line of sight over World.grid: a grid DDA between tile centers that is
+# blocked by any obstacle tile in between. Results are cached per tile pair
+# until the grid changes, and each NPC keeps its last (tile, player tile)
+# answer, so an NPC is only re-checked when it or the player changes tile.
+from pathfinding import grid_snapshot
+from config import LOS_CACHE_SIZE
+
+
+class LineOfSight:
+    def __init__(self, world, cache_size=LOS_CACHE_SIZE):
+        self.world = world
+        self.cache_size = cache_size
+        self.cache = {}        # tile pair key -> visible
+        self.version = None
+        self.npc_key = []      # npc idx -> pair key of its last answer
+        self.npc_vis = []      # npc idx -> that answer
+
+        # stats
+        self.queries = 0
+        self.traces = 0
+
+    def _sync(self):
+        world = self.world
+        if self.version == world.grid_version:
+            return
+        snap = grid_snapshot(world)
+        self.version = snap.version
+        self.w = snap.w
+        self.h = snap.h
+        self.n = snap.w * snap.h
+        self.blocked = snap.blocked
+        self.cache.clear()
+        self.npc_key = []
+        self.npc_vis = []
+
+    def _tile_of(self, pos):
+        tile = self.world.tile
+        x = min(max(int(pos[0] // tile), 0), self.w - 1)
+        y = min(max(int(pos[1] // tile), 0), self.h - 1)
+        return x * self.h + y
+
+    # ---------------------------------------
+    # QUERIES
+    # ---------------------------------------
+    def visible(self, a, b):
+        # world positions a and b
+        self._sync()
+        return self._tiles_visible(self._tile_of(a), self._tile_of(b))
+
+    def can_see_player(self, npc):
+        self._sync()
+        return self._npc_visible(npc, self._tile_of(self.world.player.pos))
+
+    def player_visibility(self, npcs=None):
+        # one call for many NPCs (default: all of world.npcs); list of bools
+        # in the same order
+        self._sync()
+        world = self.world
+        pt = self._tile_of(world.player.pos)
+        if npcs is None:
+            npcs = world.npcs
+        # _npc_visible inlined
+        keys = self.npc_key
+        vis = self.npc_vis
+        if len(keys) < len(world.npcs):
+            grow = len(world.npcs) - len(keys)
+            keys.extend([-1] * grow)
+            vis.extend([False] * grow)
+        tile, w1, h1, h, n = world.tile, self.w - 1, self.h - 1, self.h, self.n
+        out = []
+        for npc in npcs:
+            i = npc.idx
+            pos = npc.pos
+            x = int(pos[0] // tile)
+            y = int(pos[1] // tile)
+            x = 0 if x < 0 else (w1 if x > w1 else x)
+            y = 0 if y < 0 else (h1 if y > h1 else y)
+            t = x * h + y
+            key = t * n + pt
+            if keys[i] != key:
+                keys[i] = key
+                vis[i] = self._tiles_visible(t, pt)
+            out.append(vis[i])
+        self.queries += len(out)
+        return out
+
+    def _npc_visible(self, npc, pt):
+        self.queries += 1
+        keys = self.npc_key
+        i = npc.idx
+        if i >= len(keys):
+            grow = len(self.world.npcs) - len(keys)
+            keys.extend([-1] * grow)
+            self.npc_vis.extend([False] * grow)
+        t = self._tile_of(npc.pos)
+        key = t * self.n + pt
+        if keys[i] != key:
+            keys[i] = key
+            self.npc_vis[i] = self._tiles_visible(t, pt)
+        return self.npc_vis[i]
+
+    def _tiles_visible(self, a, b):
+        # symmetric: one cache entry per unordered pair
+        key = a * self.n + b if a <= b else b * self.n + a
+        v = self.cache.get(key)
+        if v is None:
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            v = self.cache[key] = self._trace(a, b)
+        return v
+
+    # ---------------------------------------
+    # DDA
+    # ---------------------------------------
+    def _trace(self, a, b):
+        # walk the tiles crossed by the segment between the two tile
+        # centers (Amanatides & Woo, in integers); the end tiles themselves
+        # don't block. A segment through a tile corner is blocked if either
+        # side tile is
+        self.traces += 1
+        if a == b:
+            return True
+        h, blocked = self.h, self.blocked
+        x0, y0 = divmod(a, h)
+        x1, y1 = divmod(b, h)
+        dx = x1 - x0
+        dy = y1 - y0
+        sx = 1 if dx > 0 else -1
+        sy = 1 if dy > 0 else -1
+        adx = abs(dx)
+        ady = abs(dy)
+        # next x / y boundary crossings at t = ex / (2*adx*ady), ey / (2*adx*ady)
+        ex = ady
+        ey = adx
+        x, y = x0, y0
+        while True:
+            if ex < ey:
+                x += sx
+                ex += 2 * ady
+            elif ey < ex:
+                y += sy
+                ey += 2 * adx
+            else:
+                if blocked[(x + sx) * h + y] or blocked[x * h + y + sy]:
+                    return False
+                x += sx
+                y += sy
+                ex += 2 * ady
+                ey += 2 * adx
+            if x == x1 and y == y1:
+                return True
+            if blocked[x * h + y]:
+                return False
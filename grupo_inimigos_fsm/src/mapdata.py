@@ -0,0 +1,260 @@
+# mapdata.py
+# Map definitions (maps/*.json: size in px, tile size, obstacle rects) and
+# their baked navigation data. Baking rasterizes the obstacles into the tile
+# grid in bulk and precomputes the free-cell list, the occupancy lookup
+# tables and, on large grids, the HPA* entrance graph. The result is one
+# binary .nav file next to the .json, memory-mapped at load; World() and
+# game resets then only wrap the mapped arrays. A missing or stale .nav is
+# baked in memory instead (same data, just not free).
+#   python mapdata.py                                   # bake every maps/*.json
+#   python mapdata.py maps/arena.json
+#   python mapdata.py --generate maps/large.json --scale 8 --seed 1
+import argparse
+import glob
+import json
+import mmap
+import os
+import random
+import struct
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+from occupancy import Occupancy
+from pathfinding import GridSnapshot
+from hpa import HierarchicalPathFinder
+from config import HPA_MIN_CELLS, HPA_CLUSTER
+
+MAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+
+MAGIC = b"GWNV"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHIIIHII")   # magic, version, source crc, width, height, tile, rects, free cells
+OCC = struct.Struct("<iiiiIIII")       # occupancy bounds x0 y0 x1 y1, cells cw ch, mixed cells, mixed members
+HPA = struct.Struct("<HII")            # cluster (0 = none), entrance nodes, edges
+# every section is padded to 4 bytes so the int32 arrays map aligned
+
+
+def rasterize(rects, grid_w, grid_h, tile):
+    # blocked[x, y] = 1 where the tile center is inside a rect (the same
+    # test Occupancy.contains does on the center), one slice per rect
+    blocked = np.zeros((grid_w, grid_h), dtype=np.uint8)
+    half = tile // 2
+    for x, y, w, h in rects:
+        if w <= 0 or h <= 0:
+            continue
+        tx0 = max(0, -((half - x) // tile))
+        tx1 = min(grid_w, (x + w - 1 - half) // tile + 1)
+        ty0 = max(0, -((half - y) // tile))
+        ty1 = min(grid_h, (y + h - 1 - half) // tile + 1)
+        if tx0 < tx1 and ty0 < ty1:
+            blocked[tx0:tx1, ty0:ty1] = 1
+    return blocked
+
+
+def resolve(path):
+    # bare names are maps/<name>.json; relative paths are relative to this
+    # directory (config.MAP_FILE), not to the working directory
+    if not path.endswith(".json"):
+        path = os.path.join(MAP_DIR, path + ".json")
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(MAP_DIR), path)
+    return os.path.normpath(path)
+
+
+def nav_path(path):
+    return os.path.splitext(path)[0] + ".nav"
+
+
+# ---------------------------------------
+# BAKE
+# ---------------------------------------
+def bake(spec, crc=0):
+    width = spec["width"]
+    height = spec["height"]
+    tile = spec.get("tile", 32)
+    grid_w = width // tile
+    grid_h = height // tile
+    rects = [tuple(r) for r in spec["obstacles"]]
+
+    blocked = rasterize(rects, grid_w, grid_h, tile).ravel()
+    free = np.flatnonzero(blocked == 0)
+    occ = Occupancy([pygame.Rect(r) for r in rects])
+    keys, offsets, members = occ.mixed_tables()
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, crc, width, height, tile, len(rects), len(free)))
+    _put(out, np.array(rects, dtype=np.int32).reshape(-1, 4))
+    _put(out, blocked)
+    _put(out, free.astype(np.int32))
+    out += OCC.pack(occ.x0, occ.y0, occ.x1, occ.y1, occ.cw, occ.ch, len(keys), len(members))
+    _put(out, occ.grid.astype(np.uint8))
+    _put(out, np.array(keys, dtype=np.int32))
+    _put(out, np.array(offsets, dtype=np.int32))
+    _put(out, np.array(members, dtype=np.int32))
+
+    if grid_w * grid_h >= HPA_MIN_CELLS:
+        hpa = HierarchicalPathFinder(None, HPA_CLUSTER)
+        hpa.load(GridSnapshot(0, grid_w, grid_h, blocked.tobytes()))
+        node_cell, offsets, targets, costs = hpa.tables()
+        out += HPA.pack(HPA_CLUSTER, len(node_cell), len(targets))
+        _pad(out)
+        for a in (node_cell, offsets, targets, costs):
+            _put(out, np.array(a, dtype=np.int32))
+    else:
+        out += HPA.pack(0, 0, 0)
+        _pad(out)
+    return bytes(out)
+
+
+def bake_file(path):
+    path = resolve(path)
+    with open(path, "rb") as f:
+        src = f.read()
+    buf = bake(json.loads(src), zlib.crc32(src))
+    # write then rename: a running game may have the old file mapped
+    out = nav_path(path)
+    with open(out + ".tmp", "wb") as f:
+        f.write(buf)
+    os.replace(out + ".tmp", out)
+    _loaded.pop(path, None)
+    return out, len(buf)
+
+
+def _pad(out):
+    out += bytes(-len(out) % 4)
+
+
+def _put(out, a):
+    out += a.tobytes()
+    _pad(out)
+
+
+def procedural(width, height, seed=0, tile=32, density=40):
+    # random tile-aligned boxes, one per `density` tiles (benchmarks, stress maps)
+    rng = random.Random(seed)
+    obstacles = []
+    for _ in range((width // tile) * (height // tile) // density):
+        w = rng.randint(1, 6) * tile
+        h = rng.randint(1, 6) * tile
+        obstacles.append([rng.randrange(0, width - w), rng.randrange(0, height - h), w, h])
+    return {"name": f"procedural-{seed}", "width": width, "height": height, "tile": tile, "obstacles": obstacles}
+
+
+# ---------------------------------------
+# LOAD
+# ---------------------------------------
+class MapData:
+    # read-only views into a baked buffer (an mmap or bytes)
+    def __init__(self, buf):
+        self.buf = buf
+        (magic, version, self.crc, self.width, self.height, self.tile,
+         n_rects, n_free) = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError("not a baked map")
+        if version != VERSION:
+            raise ValueError(f"baked map version {version}, expected {VERSION}")
+        self.grid_w = self.width // self.tile
+        self.grid_h = self.height // self.tile
+        pos = HEADER.size
+
+        rects, pos = self._take(pos, np.int32, n_rects * 4)
+        self.rects = [tuple(r) for r in rects.reshape(-1, 4).tolist()]
+        self.blocked, pos = self._take(pos, np.uint8, self.grid_w * self.grid_h)
+        self.free, pos = self._take(pos, np.int32, n_free)
+
+        x0, y0, x1, y1, cw, ch, n_mixed, n_members = OCC.unpack_from(buf, pos)
+        pos += OCC.size
+        state, pos = self._take(pos, np.uint8, cw * ch)
+        keys, pos = self._take(pos, np.int32, n_mixed)
+        offsets, pos = self._take(pos, np.int32, n_mixed + 1)
+        members, pos = self._take(pos, np.int32, n_members)
+        self.obstacles = [pygame.Rect(r) for r in self.rects]
+        self.occupancy = Occupancy.from_tables(self.obstacles, (x0, y0, x1, y1, cw, ch),
+                                               state, keys, offsets, members)
+
+        self.hpa_cluster, n_nodes, n_edges = HPA.unpack_from(buf, pos)
+        pos += HPA.size + (-(pos + HPA.size) % 4)
+        self._hpa = []
+        if self.hpa_cluster:
+            for count in (n_nodes, n_nodes + 1, n_edges, n_edges):
+                a, pos = self._take(pos, np.int32, count)
+                self._hpa.append(a)
+
+        # plain-Python forms, built once per map (World copies the grid)
+        self.grid = self.blocked.reshape(self.grid_w, self.grid_h).tolist()
+        self.blocked_bytes = self.blocked.tobytes()
+
+    def _take(self, pos, dtype, count):
+        a = np.frombuffer(self.buf, dtype=dtype, count=count, offset=pos)
+        return a, pos + a.nbytes + (-a.nbytes % 4)
+
+    @property
+    def hpa_tables(self):
+        return [a.tolist() for a in self._hpa]
+
+
+_loaded = {}   # resolved path -> MapData, shared by every World in the process
+
+
+def load_map(path):
+    path = resolve(path)
+    data = _loaded.get(path)
+    if data is None:
+        data = _loaded[path] = _load(path)
+    return data
+
+
+def _load(path):
+    with open(path, "rb") as f:
+        src = f.read()
+    crc = zlib.crc32(src)
+    nav = nav_path(path)
+    if os.path.exists(nav):
+        with open(nav, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, baked_crc = HEADER.unpack_from(mm)[:3]
+        if magic == MAGIC and version == VERSION and baked_crc == crc:
+            data = MapData(mm)
+            # baked with another HPA_CLUSTER: stale too
+            if data.hpa_cluster in (0, HPA_CLUSTER):
+                return data
+            del data
+        mm.close()
+    return MapData(bake(json.loads(src), crc))
+
+
+# ---------------------------------------
+# CLI
+# ---------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="bake map definitions into memory-mapped .nav files")
+    ap.add_argument("maps", nargs="*", help="map .json files or names (default: every maps/*.json)")
+    ap.add_argument("--generate", metavar="OUT.json", help="write a procedural map first (and bake it)")
+    ap.add_argument("--scale", type=int, default=8, help="procedural map size in default-map widths/heights")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    paths = [p if not p.endswith(".json") else os.path.abspath(p) for p in args.maps]
+    if args.generate:
+        base = load_map("default")
+        spec = procedural(base.width * args.scale, base.height * args.scale, args.seed, base.tile)
+        with open(args.generate, "w") as f:
+            json.dump(spec, f)
+        paths.append(os.path.abspath(args.generate))
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(MAP_DIR, "*.json")))
+
+    for path in paths:
+        t = time.perf_counter()
+        out, size = bake_file(path)
+        ms = (time.perf_counter() - t) * 1000
+        data = load_map(path)
+        print(f"{os.path.relpath(out)}: {data.grid_w}x{data.grid_h} tiles, {len(data.rects)} obstacles, "
+              f"{len(data.free)} free, hpa cluster {data.hpa_cluster or '-'}, {size / 1e3:.0f} KB in {ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,30 @@
 # npc.py
 import random
-from utils import distance, normalize, sub, add, mul
-from steering import seek, separation, cohesion, alignment, flee
-from fsm import FSM, Patrol, Engage, Retreat, Dead
-from config import NPC_MAX_SPEED, NPC_RADIUS, CHARGE_COOLDOWN, CHARGE_SPEED, PATH_REPLAN_INTERVAL, DETECTION_RANGE
-from projectile import Projectile
+from utils import distance, set2
+from steering import seek, separation, cohesion, alignment, SEP_RADIUS
+from fsm import FSM, PATROL, HEALTH, ALLY_DIED
+from config import NPC_MAX_SPEED, NPC_RADIUS, CHARGE_COOLDOWN, CHARGE_SPEED, PATH_REPLAN_INTERVAL, DETECTION_RANGE, NEIGHBOR_RADIUS
+
+# scratch vectors for the steering terms, reused by every NPC update
+_SEP = [0.0, 0.0]
+_ALI = [0.0, 0.0]
+_COH = [0.0, 0.0]
+_SEEK = [0.0, 0.0]
+_FORCE = [0.0, 0.0]
 
 class BaseNPC:
+    # no per-instance __dict__; pos/vel are 2-lists updated in place and
+    # never rebound (the spatial hash and batch engines read them)
+    __slots__ = (
+        "world", "idx", "pos", "vel", "radius", "health", "max_speed", "alive",
+        "fsm", "patrol_target", "charge_cd",
+        "path", "path_idx", "next_replan", "path_goal", "path_pending",
+        "path_future", "future_goal", "stunned", "lod_dt",
+    )
+
     def __init__(self, world, x, y):
         self.world = world
+        self.idx = -1  # index in world.npcs, set by World.add_npc
         self.pos = [float(x), float(y)]
         self.vel = [0.0, 0.0]
         self.radius = NPC_RADIUS
@@ -17,7 +33,7 @@ class BaseNPC:
         self.alive = True
 
         self.fsm = FSM(self)
-        self.fsm.change(Patrol())
+        self.fsm.change(PATROL)
 
         self.patrol_target = self.pos[:]
         self.charge_cd = 0.0
@@ -26,8 +42,15 @@ class BaseNPC:
         self.path = None
         self.path_idx = 0
         self.next_replan = 0.0
+        self.path_goal = None      # goal tile of the current path
+        self.path_pending = False  # waiting on world.path_queue
+        self.path_future = None    # in flight on world.path_service
+        self.future_goal = None
         self.stunned = 0.0  # for EMP stun
 
+        # dt accumulated while skipped by the AI LOD scheduler
+        self.lod_dt = 0.0
+
     def pick_patrol_target(self):
         self.patrol_target = [
             random.randint(60, self.world.map_w - 60),
@@ -35,18 +58,22 @@ class BaseNPC:
         ]
 
     def neighbors(self):
-        return [
-            n for n in self.world.npcs
-            if n is not self and n.alive and distance(self.pos, n.pos) < 140
-        ]
+        return self.world.npcs_in_radius(self.pos, NEIGHBOR_RADIUS, exclude=self)
+
+    def row(self):
+        # this NPC's index into the world.perception arrays
+        if self.idx < 0:
+            raise RuntimeError("NPC not added to the world (World.add_npc)")
+        return self.idx
 
     def can_see_player(self):
-        return distance(self.pos, self.world.player.pos) < DETECTION_RANGE
+        return (self.world.perception.dist[self.row()] < DETECTION_RANGE
+                and self.world.los.can_see_player(self))
 
     def behavior_patrol(self, dt):
         if distance(self.pos, self.patrol_target) < 12:
             self.pick_patrol_target()
-        desired = seek(self.pos, self.patrol_target, self.max_speed * 0.45)
+        desired = seek(self.pos, self.patrol_target, self.max_speed * 0.45, _SEEK)
         self.apply_force(desired, dt)
 
     def behavior_engage(self, dt):
@@ -55,29 +82,53 @@ class BaseNPC:
             return
 
         player_pos = self.world.player.pos
-        neigh = self.neighbors()
-
-        s = separation(self, neigh)
-        c = cohesion(self, neigh)
-        a = alignment(self, neigh)
-        sk = seek(self.pos, player_pos, self.max_speed)
-
-        force = [
-            sk[0] + s[0] * 1.2 + c[0] * 0.35 + a[0] * 0.4,
-            sk[1] + s[1] * 1.2 + c[1] * 0.35 + a[1] * 0.4,
-        ]
+        per = self.world.perception
+        i = self.row()
 
         # melee damage
-        if distance(self.pos, player_pos) < 22:
+        if per.melee[i]:
             self.world.player.damage(18 * dt)
 
-        # pathfinding replan
+        # follow path waypoints if exist (no cohesion while on a path)
+        target = player_pos
+        w_coh = 0.35
+        wp = self.next_waypoint(player_pos, dt)
+        if wp is not None:
+            target = wp
+            w_coh = 0.0
+
+        # charge ability
+        if self.charge_cd <= 0 and per.charge[i]:
+            set2(self.vel, per.ux[i] * CHARGE_SPEED, per.uy[i] * CHARGE_SPEED)
+            self.charge_cd = CHARGE_COOLDOWN
+        else:
+            self.steer_to(target, w_coh, dt)
+
+        self.charge_cd = max(0.0, self.charge_cd - dt)
+
+    def next_waypoint(self, player_pos, dt):
+        # shared flow field toward the player: O(1) lookup, no per-NPC search
+        flow = self.world.flow
+        if flow is not None:
+            tile = self.world.tile
+            step = flow.next_step((int(self.pos[0] // tile), int(self.pos[1] // tile)))
+            if step is None:
+                return None
+            return (step[0] * tile + tile / 2, step[1] * tile + tile / 2)
+
+        # async path finished: switch to it
+        fut = self.path_future
+        if fut is not None and fut.done():
+            self.path_future = None
+            if not fut.cancelled():
+                self.set_path(fut.result(), self.future_goal)
+
+        # pathfinding replan (unless one is already queued)
         self.next_replan -= dt
-        if (self.path is None or self.next_replan <= 0):
+        if not self.path_pending and (self.path is None or self.next_replan <= 0 or self.path_exhausted()):
             self.plan_path_to(player_pos)
             self.next_replan = PATH_REPLAN_INTERVAL
 
-        # follow path waypoints if exist
         if self.path:
             if self.path_idx < len(self.path):
                 wp = self.path[self.path_idx]
@@ -87,46 +138,70 @@ class BaseNPC:
                 if distance(self.pos, (wx, wy)) < 10:
                     self.path_idx += 1
                 else:
-                    pseek = seek(self.pos, (wx, wy), self.max_speed)
-                    force = [
-                        pseek[0] + s[0] * 1.2 + a[0] * 0.4,
-                        pseek[1] + s[1] * 1.2 + a[1] * 0.4,
-                    ]
+                    return (wx, wy)
+        return None
+
+    def steer_to(self, target, w_coh, dt):
+        # seek + flocking; batched for the whole swarm when enabled
+        batch = self.world.batch_steering
+        if batch is not None:
+            batch.request(self, target, w_coh, dt)
+            return
 
-        # charge ability
-        if self.charge_cd <= 0 and distance(self.pos, player_pos) > 70:
-            d = normalize([player_pos[0] - self.pos[0], player_pos[1] - self.pos[1]])
-            self.vel = mul(d, CHARGE_SPEED)
-            self.charge_cd = CHARGE_COOLDOWN
+        squads = self.world.squads
+        if squads is not None:
+            # cohesion/alignment from the squad's sums; only separation
+            # needs the (much shorter) neighbor list
+            s = separation(self, self.world.npcs_in_radius(self.pos, SEP_RADIUS, exclude=self), _SEP)
+            a = squads.alignment(self, _ALI)
         else:
-            self.apply_force(force, dt)
-
-        self.charge_cd = max(0.0, self.charge_cd - dt)
+            neigh = self.neighbors()
+            s = separation(self, neigh, _SEP)
+            a = alignment(self, neigh, _ALI)
+        sk = seek(self.pos, target, self.max_speed, _SEEK)
+        if w_coh:
+            c = squads.cohesion(self, _COH) if squads is not None else cohesion(self, neigh, _COH)
+            force = set2(_FORCE,
+                sk[0] + s[0] * 1.2 + c[0] * w_coh + a[0] * 0.4,
+                sk[1] + s[1] * 1.2 + c[1] * w_coh + a[1] * 0.4,
+            )
+        else:
+            force = set2(_FORCE,
+                sk[0] + s[0] * 1.2 + a[0] * 0.4,
+                sk[1] + s[1] * 1.2 + a[1] * 0.4,
+            )
+        self.apply_force(force, dt)
 
     def behavior_retreat(self, dt):
-        f = flee(self.pos, self.world.player.pos, self.max_speed * 0.9)
-        self.apply_force(f, dt)
+        # flee: straight away from the player
+        per = self.world.perception
+        speed = self.max_speed * 0.9
+        i = self.row()
+        self.apply_force(set2(_SEEK, -per.ux[i] * speed, -per.uy[i] * speed), dt)
 
     def apply_force(self, desired_vel, dt):
+        vel = self.vel
+        pos = self.pos
         # velocity smoothing
-        self.vel[0] += (desired_vel[0] - self.vel[0]) * dt * 6.0
-        self.vel[1] += (desired_vel[1] - self.vel[1]) * dt * 6.0
+        vel[0] += (desired_vel[0] - vel[0]) * dt * 6.0
+        vel[1] += (desired_vel[1] - vel[1]) * dt * 6.0
 
         # clamp speed
-        speed = (self.vel[0]**2 + self.vel[1]**2) ** 0.5
+        speed = (vel[0]**2 + vel[1]**2) ** 0.5
         if speed > self.max_speed:
             k = self.max_speed / speed
-            self.vel[0] *= k
-            self.vel[1] *= k
+            vel[0] *= k
+            vel[1] *= k
 
-        newx = self.pos[0] + self.vel[0] * dt
-        newy = self.pos[1] + self.vel[1] * dt
+        newx = pos[0] + vel[0] * dt
+        newy = pos[1] + vel[1] * dt
 
         if not self.world.point_in_obstacle((newx, newy)):
-            self.pos[0] = newx
-            self.pos[1] = newy
+            pos[0] = newx
+            pos[1] = newy
         else:
-            self.vel = [0.0, 0.0]
+            vel[0] = 0.0
+            vel[1] = 0.0
 
     def update(self, dt):
         if not self.alive:
@@ -134,9 +209,8 @@ class BaseNPC:
         self.fsm.update(dt)
         if self.health <= 0 and self.alive:
             self.alive = False
-            for n in self.world.npcs:
-                if n.alive:
-                    n.fsm.change(self.world.retreat_state())
+            # the others retreat when World.events dispatches this
+            self.world.events.emit(ALLY_DIED, self)
 
     def plan_path_to(self, world_pos):
         tx = int(world_pos[0] // self.world.tile)
@@ -144,16 +218,53 @@ class BaseNPC:
         sx = int(self.pos[0] // self.world.tile)
         sy = int(self.pos[1] // self.world.tile)
 
-        path = self.world.astar((sx, sy), (tx, ty))
+        service = self.world.path_service
+        if service is not None:
+            goal = (tx, ty)
+            if self.path_future is not None:
+                if goal == self.future_goal:
+                    return
+                # player moved to another tile: that answer is stale
+                service.cancel(self.path_future)
+            elif goal == self.path_goal and not self.path_exhausted():
+                return
+            self.path_future = service.submit((sx, sy), goal)
+            self.future_goal = goal
+            return
+
+        queue = self.world.path_queue
+        if queue is not None:
+            # target tile unchanged: keep following the current path
+            if (tx, ty) == self.path_goal and not self.path_exhausted():
+                return
+            queue.request(self)
+            return
+
+        prof = self.world.prof
+        if prof.enabled:
+            prof.start("astar")
+            path = self.world.find_path((sx, sy), (tx, ty))
+            prof.stop("astar")
+        else:
+            path = self.world.find_path((sx, sy), (tx, ty))
+        self.set_path(path, (tx, ty))
+
+    def path_exhausted(self):
+        # followed a partial (hierarchical) path to its end: plan the next leg
+        path = self.path
+        return path is not None and self.path_idx >= len(path) and path[-1] != self.path_goal
+
+    def set_path(self, path, goal):
         if path:
             self.path = path
             self.path_idx = 0
         else:
             self.path = None
             self.path_idx = 0
-
+        self.path_goal = goal
 
 class Brute(BaseNPC):
+    __slots__ = ()
     COLOR = (255, 74, 74)
     def __init__(self, world, x, y):
         super().__init__(world, x, y)
@@ -163,6 +274,7 @@ class Brute(BaseNPC):
 
 
 class Shooter(BaseNPC):
+    __slots__ = ("shoot_cd",)
     COLOR = (255, 229, 93)
     def __init__(self, world, x, y):
         super().__init__(world, x, y)
@@ -175,15 +287,16 @@ class Shooter(BaseNPC):
 
         # shooting behavior
         self.shoot_cd -= dt
-        player = self.world.player
-        if self.shoot_cd <= 0 and distance(self.pos, player.pos) < 420:
-            d = normalize([player.pos[0] - self.pos[0], player.pos[1] - self.pos[1]])
-            vel = mul(d, 440)
+        per = self.world.perception
+        i = self.row()
+        if self.shoot_cd <= 0 and per.shoot[i] and self.world.los.can_see_player(self):
+            vel = [per.ux[i] * 440, per.uy[i] * 440]
             self.world.spawn_projectile(self.pos[:], vel, dmg=18, owner=self)
             self.shoot_cd = 1.0
 
 
 class Support(BaseNPC):
+    __slots__ = ("heal_cd",)
     COLOR = (194, 111, 255)
     def __init__(self, world, x, y):
         super().__init__(world, x, y)
@@ -194,9 +307,10 @@ class Support(BaseNPC):
     def behavior_engage(self, dt):
         self.heal_cd -= dt
         if self.heal_cd <= 0:
-            for n in self.world.npcs:
-                if n is not self and n.alive and distance(self.pos, n.pos) < 90 and n.health < 200:
+            for n in self.world.npcs_in_radius(self.pos, 90, exclude=self):
+                if n.health < 200:
                     n.health = min(n.health + 28, 220)
+                    self.world.events.emit(HEALTH, n)
                     self.heal_cd = 5.0
                     break
         super().behavior_engage(dt)
@@ -0,0 +1,148 @@
+# occupancy.py
+# Precomputed point-in-obstacle lookup. The bounding box of the obstacles is
+# split into 8x8 px cells that are empty, fully covered, or mixed (crossed by
+# a rect edge); only mixed cells fall back to testing their few rects.
+# Points are truncated to int first, like pygame.Rect.collidepoint.
+# Baked maps (mapdata.py) store these tables and load them with from_tables.
+import numpy as np
+
+SHIFT = 3
+CELL = 1 << SHIFT
+
+EMPTY = 0
+FULL = 1
+MIXED = 2
+
+
+class Occupancy:
+    def __init__(self, rects):
+        self.rects = [(r.left, r.top, r.right, r.bottom) for r in rects if r.width > 0 and r.height > 0]
+        if not self.rects:
+            self.x0 = self.y0 = self.x1 = self.y1 = 0
+            self.cw = self.ch = 0
+            self.state = bytearray()
+            self.grid = np.zeros((0, 0), dtype=np.uint8)
+            self.mixed = {}
+            return
+
+        self.x0 = min(r[0] for r in self.rects)
+        self.y0 = min(r[1] for r in self.rects)
+        self.x1 = max(r[2] for r in self.rects)
+        self.y1 = max(r[3] for r in self.rects)
+        self.cw = (self.x1 - self.x0 + CELL - 1) >> SHIFT
+        self.ch = (self.y1 - self.y0 + CELL - 1) >> SHIFT
+
+        grid = np.zeros((self.ch, self.cw), dtype=np.uint8)
+        mixed = {}
+        for rect in self.rects:
+            l, t, r, b = rect
+            # cells touched by the rect
+            c0 = (l - self.x0) >> SHIFT
+            c1 = (r - 1 - self.x0) >> SHIFT
+            r0 = (t - self.y0) >> SHIFT
+            r1 = (b - 1 - self.y0) >> SHIFT
+            for cy in range(r0, r1 + 1):
+                top = self.y0 + (cy << SHIFT)
+                full_y = t <= top and top + CELL <= b
+                for cx in range(c0, c1 + 1):
+                    if grid[cy, cx] == FULL:
+                        continue
+                    left = self.x0 + (cx << SHIFT)
+                    if full_y and l <= left and left + CELL <= r:
+                        grid[cy, cx] = FULL
+                        mixed.pop(cy * self.cw + cx, None)
+                    else:
+                        grid[cy, cx] = MIXED
+                        mixed.setdefault(cy * self.cw + cx, []).append(rect)
+
+        self.grid = grid
+        self.state = bytearray(grid.tobytes())
+        self.mixed = mixed
+
+    @classmethod
+    def from_tables(cls, rects, bounds, state, keys, offsets, members):
+        # rebuild from mixed_tables() output without touching any cell
+        occ = cls.__new__(cls)
+        occ.rects = [(r.left, r.top, r.right, r.bottom) for r in rects if r.width > 0 and r.height > 0]
+        occ.x0, occ.y0, occ.x1, occ.y1, occ.cw, occ.ch = bounds
+        occ.grid = np.asarray(state, dtype=np.uint8).reshape(occ.ch, occ.cw)
+        occ.state = occ.grid.tobytes()
+        occ.mixed = _BakedMixed(occ.rects, keys, offsets, members)
+        return occ
+
+    def mixed_tables(self):
+        # mixed cells as sorted keys + CSR lists of indices into self.rects
+        index = {id(r): i for i, r in enumerate(self.rects)}
+        keys = sorted(self.mixed)
+        offsets = [0]
+        members = []
+        for k in keys:
+            members.extend(index[id(r)] for r in self.mixed[k])
+            offsets.append(len(members))
+        return keys, offsets, members
+
+    def contains(self, pt):
+        x = int(pt[0])
+        y = int(pt[1])
+        if x < self.x0 or y < self.y0 or x >= self.x1 or y >= self.y1:
+            return False
+        k = ((y - self.y0) >> SHIFT) * self.cw + ((x - self.x0) >> SHIFT)
+        s = self.state[k]
+        if s == EMPTY:
+            return False
+        if s == FULL:
+            return True
+        for l, t, r, b in self.mixed[k]:
+            if l <= x < r and t <= y < b:
+                return True
+        return False
+
+    def contains_many(self, pts):
+        # boolean array for an (N, 2) float array of points
+        pts = np.asarray(pts, dtype=np.float64)
+        out = np.zeros(len(pts), dtype=bool)
+        if not self.rects or len(pts) == 0:
+            return out
+        ix = np.trunc(pts[:, 0])
+        iy = np.trunc(pts[:, 1])
+        inside = (ix >= self.x0) & (iy >= self.y0) & (ix < self.x1) & (iy < self.y1)
+        idx = np.nonzero(inside)[0]
+        if len(idx) == 0:
+            return out
+        cx = (ix[idx].astype(np.int64) - self.x0) >> SHIFT
+        cy = (iy[idx].astype(np.int64) - self.y0) >> SHIFT
+        s = self.grid[cy, cx]
+        out[idx[s == FULL]] = True
+
+        m = s == MIXED
+        if m.any():
+            mi = idx[m]
+            mx, my = ix[mi], iy[mi]
+            if len(self.rects) <= 32:
+                hit = np.zeros(len(mi), dtype=bool)
+                for l, t, r, b in self.rects:
+                    hit |= (mx >= l) & (mx < r) & (my >= t) & (my < b)
+                out[mi] = hit
+            else:
+                contains = self.contains
+                for i, x, y in zip(mi.tolist(), mx.tolist(), my.tolist()):
+                    out[i] = contains((x, y))
+        return out
+
+
+class _BakedMixed(dict):
+    # mixed cell -> rects, filled in from the baked CSR tables on first use
+    def __init__(self, rects, keys, offsets, members):
+        super().__init__()
+        self.rects = rects
+        self.keys = keys
+        self.offsets = offsets
+        self.members = members
+
+    def __missing__(self, k):
+        j = int(np.searchsorted(self.keys, k))
+        if j == len(self.keys) or self.keys[j] != k:
+            raise KeyError(k)
+        rects = self.rects
+        v = self[k] = [rects[m] for m in self.members[self.offsets[j]:self.offsets[j + 1]].tolist()]
+        return v
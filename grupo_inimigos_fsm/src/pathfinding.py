@@ -0,0 +1,151 @@
+# pathfinding.py
+# A* over World.grid using flat integer-indexed arrays (i = x*grid_h + y),
+# a closed set, goal-ward tie-breaking and an LRU cache of finished paths.
+import heapq
+from collections import OrderedDict, namedtuple
+
+# immutable copy of World.grid: blocked[x*h + y] == 1 for obstacle tiles
+GridSnapshot = namedtuple("GridSnapshot", "version w h blocked")
+
+
+def grid_snapshot(world):
+    # World keeps the flat bytes next to the grid
+    return GridSnapshot(world.grid_version, world.grid_w, world.grid_h, world.blocked)
+
+
+class PathFinder:
+    def __init__(self, world, cache_size=256):
+        self.world = world
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.version = None
+
+        # stats (read by profiling/benchmarks)
+        self.calls = 0
+        self.expanded = 0
+        self.cache_hits = 0
+
+    @classmethod
+    def from_snapshot(cls, snapshot, cache_size=256):
+        # standalone finder over a frozen grid (no world), e.g. in a worker
+        pf = cls(None, cache_size)
+        pf.load(snapshot)
+        return pf
+
+    def _sync(self):
+        # (re)build the flat arrays when the grid version changes
+        world = self.world
+        if world is None or self.version == world.grid_version:
+            return
+        self.load(grid_snapshot(world))
+
+    def load(self, snapshot):
+        self.version = snapshot.version
+        self.w = snapshot.w
+        self.h = snapshot.h
+        n = self.w * self.h
+        blocked = snapshot.blocked
+        h = self.h
+        self.blocked = blocked
+
+        # free 4-neighbors of every cell, in the old (+x, -x, +y, -y) order
+        adj = [None] * n
+        for x in range(self.w):
+            for y in range(h):
+                i = x * h + y
+                nb = []
+                if x < self.w - 1 and not blocked[i + h]:
+                    nb.append(i + h)
+                if x > 0 and not blocked[i - h]:
+                    nb.append(i - h)
+                if y < h - 1 and not blocked[i + 1]:
+                    nb.append(i + 1)
+                if y > 0 and not blocked[i - 1]:
+                    nb.append(i - 1)
+                adj[i] = nb
+        self.adj = adj
+        self.g = [0] * n
+        self.parent = [0] * n
+        self.stamp = [0] * n      # g/parent valid when stamp == gen
+        self.closed = [0] * n     # closed when closed == gen
+        self.gen = 0
+        self.cache.clear()
+
+    def find(self, start, goal):
+        # same contract as the old World.astar: list of (x, y) from start to
+        # goal inclusive, or None. Cached lists are shared: don't mutate them.
+        self._sync()
+        self.calls += 1
+        key = (start, goal)
+        cache = self.cache
+        if key in cache:
+            cache.move_to_end(key)
+            self.cache_hits += 1
+            return cache[key]
+
+        path = self._search(start, goal)
+        cache[key] = path
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return path
+
+    def _search(self, start, goal):
+        w, h = self.w, self.h
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= gx < w and 0 <= gy < h):
+            return None
+        if not (0 <= sx < w and 0 <= sy < h):
+            return None
+        gi = gx * h + gy
+        if self.blocked[gi]:
+            return None
+        si = sx * h + sy
+
+        self.gen += 1
+        gen = self.gen
+        g = self.g
+        parent = self.parent
+        stamp = self.stamp
+        closed = self.closed
+
+        g[si] = 0
+        parent[si] = -1
+        stamp[si] = gen
+        # (f, h, index): on equal f prefer the node closer to the goal
+        hs = abs(sx - gx) + abs(sy - gy)
+        openh = [(hs, hs, si)]
+        push = heapq.heappush
+        pop = heapq.heappop
+        adj = self.adj
+        expanded = 0
+
+        while openh:
+            _, _, i = pop(openh)
+            if closed[i] == gen:
+                continue
+            if i == gi:
+                self.expanded += expanded
+                path = []
+                while i != -1:
+                    path.append((i // h, i % h))
+                    i = parent[i]
+                path.reverse()
+                return path
+            closed[i] = gen
+            expanded += 1
+
+            ng = g[i] + 1
+            for j in adj[i]:
+                if closed[j] == gen:
+                    continue
+                if stamp[j] == gen and g[j] <= ng:
+                    continue
+                stamp[j] = gen
+                g[j] = ng
+                parent[j] = i
+                hj = abs(j // h - gx) + abs(j % h - gy)
+                push(openh, (ng + hj, hj, j))
+
+        self.expanded += expanded
+        return None
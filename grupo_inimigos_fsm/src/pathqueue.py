@@ -0,0 +1,49 @@
+# pathqueue.py
+# Central path-request queue: NPCs ask for a path to the player and keep
+# following their old one until it's delivered. Each tick the queue solves
+# requests closest-to-the-player first until a node budget is spent.
+from config import PATH_NODE_BUDGET, PATH_REPLAN_INTERVAL
+
+
+class PathQueue:
+    def __init__(self, world, node_budget=PATH_NODE_BUDGET):
+        self.world = world
+        self.node_budget = node_budget
+        self.pending = {}     # npc -> None (insertion-ordered set)
+        self.delivered = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def request(self, npc):
+        # start/goal are read when the request is served, so they're fresh
+        self.pending[npc] = None
+        npc.path_pending = True
+
+    def process(self):
+        if not self.pending:
+            return
+        world = self.world
+        px, py = world.player.pos
+        tile = world.tile
+        goal = (int(px // tile), int(py // tile))
+
+        def dist2(n):
+            dx = n.pos[0] - px
+            dy = n.pos[1] - py
+            return dx * dx + dy * dy
+
+        order = sorted(self.pending, key=dist2)
+        start_nodes = world.path_nodes()
+        for npc in order:
+            # always serve at least one request per tick
+            if world.path_nodes() - start_nodes >= self.node_budget and npc is not order[0]:
+                break
+            del self.pending[npc]
+            npc.path_pending = False
+            if not npc.alive:
+                continue
+            start = (int(npc.pos[0] // tile), int(npc.pos[1] // tile))
+            npc.set_path(world.find_path(start, goal), goal)
+            npc.next_replan = PATH_REPLAN_INTERVAL
+            self.delivered += 1
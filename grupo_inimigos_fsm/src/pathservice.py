@@ -0,0 +1,68 @@
+# pathservice.py
+# Asynchronous A*: plan_path_to requests are solved in a process pool
+# against an immutable snapshot of World.grid and handed back as futures
+# that the NPC polls. With workers=0 every request is solved on submit
+# (already-done futures), which keeps headless runs deterministic.
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from pathfinding import PathFinder, grid_snapshot
+from config import PATH_WORKERS
+
+_finder = None   # one PathFinder per worker process
+
+
+def _init_worker(snapshot):
+    global _finder
+    _finder = PathFinder.from_snapshot(snapshot)
+
+
+def _solve(start, goal):
+    return _finder.find(start, goal)
+
+
+class PathService:
+    def __init__(self, world, workers=PATH_WORKERS):
+        self.world = world
+        self.workers = workers
+        self.pool = None       # started on the first async request
+        self.version = None    # grid version the pool's snapshot was taken at
+
+        # stats
+        self.submitted = 0
+        self.cancelled = 0
+
+    def submit(self, start, goal):
+        self.submitted += 1
+        if not self.workers:
+            fut = Future()
+            fut.set_result(self.world.find_path(start, goal))
+            return fut
+        self._sync()
+        return self.pool.submit(_solve, start, goal)
+
+    def cancel(self, fut):
+        # stale request (the player moved on): drop it if it hasn't started;
+        # a running one finishes and its result is simply never read
+        if fut.cancel():
+            self.cancelled += 1
+
+    def _sync(self):
+        # new grid: restart the pool on a fresh snapshot. Queued requests on
+        # the old grid are cancelled, so NPCs re-request on their next replan
+        if self.pool is not None and self.version == self.world.grid_version:
+            return
+        self.close()
+        self.version = self.world.grid_version
+        # spawn, not fork: the parent holds an SDL window
+        self.pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(grid_snapshot(self.world),),
+        )
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
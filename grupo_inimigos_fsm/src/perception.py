@@ -0,0 +1,54 @@
+# perception.py
+# World.perception: what every NPC knows about the player this tick, computed
+# in one numpy pass at the start of World.update. Rows are indexed by
+# npc.idx and stored as plain lists (behaviors read one value at a time).
+# Values are taken at the start of the tick: NPCs only move themselves and
+# the player doesn't move during World.update, so each NPC sees its own row
+# as current when its update runs.
+from itertools import chain
+
+import numpy as np
+
+from config import DETECTION_RANGE, MELEE_RANGE, CHARGE_MIN_RANGE, SHOOT_RANGE
+
+
+class Perception:
+    def __init__(self):
+        self.n = 0
+        self.pos = np.zeros((0, 2))   # NPC positions (array, for squads)
+        self.dist = []       # distance to the player
+        self.d2 = []         # its square (LOD bands)
+        self.ux = []         # unit vector toward the player (0, 0 on top of it)
+        self.uy = []
+        self.alive = []
+        self.melee = []      # dist < MELEE_RANGE
+        self.charge = []     # dist > CHARGE_MIN_RANGE
+        self.shoot = []      # dist < SHOOT_RANGE
+        self.detected = []   # indices of alive NPCs within DETECTION_RANGE
+
+        # stats
+        self.updates = 0
+
+    def update(self, world):
+        npcs = world.npcs
+        n = len(npcs)
+        self.n = n
+        self.updates += 1
+        px, py = world.player.pos
+        pos = np.fromiter(chain.from_iterable(npc.pos for npc in npcs), np.float64, 2 * n).reshape(n, 2)
+        alive = np.fromiter((npc.alive for npc in npcs), bool, n)
+        self.pos = pos
+
+        dx = px - pos[:, 0]
+        dy = py - pos[:, 1]
+        dist = np.hypot(dx, dy)
+        some = dist > 0
+        self.dist = dist.tolist()
+        self.d2 = (dx * dx + dy * dy).tolist()
+        self.ux = np.divide(dx, dist, out=np.zeros(n), where=some).tolist()
+        self.uy = np.divide(dy, dist, out=np.zeros(n), where=some).tolist()
+        self.alive = alive.tolist()
+        self.melee = (dist < MELEE_RANGE).tolist()
+        self.charge = (dist > CHARGE_MIN_RANGE).tolist()
+        self.shoot = (dist < SHOOT_RANGE).tolist()
+        self.detected = np.flatnonzero(alive & (dist < DETECTION_RANGE)).tolist()
@@ -1,6 +1,6 @@
 # player.py
 import pygame
-from utils import normalize, distance, mul
+from utils import normalize, mul
 
 class Player:
     def __init__(self, world):
@@ -18,6 +18,7 @@ class Player:
         self.dash_cd = 0.0
         self.emp_cd = 0.0
         self.shoot_cd = 0.0
+        self.shots_fired = 0
 
         # parâmetros
         self.move_speed = 220
@@ -59,13 +60,12 @@ class Player:
 
         print("EMP!")
 
-        for n in self.world.npcs:
-            if n.alive and distance(self.pos, n.pos) < 160:
-                n.health -= 20
-                # stun leve
-                n.vel = [0,0]
-                n.stunned = 0.6
-                n.fsm.change(self.world.retreat_state())
+        for n in self.world.npcs_in_radius(self.pos, 160):
+            n.health -= 20
+            # stun leve
+            n.vel[0] = n.vel[1] = 0
+            n.stunned = 0.6
+            n.fsm.change(self.world.retreat_state())
 
         self.emp_cd = 4.0
 
@@ -82,12 +82,13 @@ class Player:
         vel = mul(n, 520)
 
         self.world.spawn_projectile(self.pos[:], vel, dmg=28, owner=self)
+        self.shots_fired += 1
         self.shoot_cd = 0.25
 
     # ---------------------------------------
     # UPDATE
     # ---------------------------------------
-    def update(self, dt, keys, mouse, camx, camy):
+    def update(self, dt, keys, mouse, camx, camy, buttons=None):
         if not self.alive:
             return
 
@@ -116,7 +117,9 @@ class Player:
         if keys[pygame.K_e]:
             self.use_emp()
 
-        if pygame.mouse.get_pressed()[0]:
+        if buttons is None:
+            buttons = pygame.mouse.get_pressed()
+        if buttons[0]:
             self.shoot(mouse_world)
 
         # movement clamp
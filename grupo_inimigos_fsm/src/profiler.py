@@ -0,0 +1,94 @@
+# profiler.py
+# Per-frame phase timings and counters with rolling averages / p99.
+# Call sites check `prof.enabled` first, so a disabled profiler costs one
+# attribute lookup per phase.
+import time
+from collections import deque
+
+perf_counter = time.perf_counter
+
+
+class Profiler:
+    def __init__(self, window=240):
+        self.enabled = False
+        self.window = window
+        self.frame = {}       # phase -> ms accumulated this frame
+        self.counts = {}      # counter -> value this frame
+        self.history = {}     # phase/counter -> deque of per-frame values
+        self.frame_ms = deque(maxlen=window)
+        self._start = {}
+        self._last = {}       # last seen value of the world's cumulative counters
+
+    def start(self, name):
+        self._start[name] = perf_counter()
+
+    def stop(self, name):
+        ms = (perf_counter() - self._start[name]) * 1000.0
+        self.frame[name] = self.frame.get(name, 0.0) + ms
+
+    def add(self, name, k=1):
+        self.counts[name] = self.counts.get(name, 0) + k
+
+    def sample(self, world):
+        # per-frame deltas of the counters the world keeps anyway
+        self._delta("astar_calls", world.pathfinder.calls)
+        self._delta("astar_nodes", world.path_nodes())
+        if world.hpa is not None:
+            self._delta("hpa_calls", world.hpa.calls)
+        self._delta("neighbor_queries", world.radius_queries)
+        self._delta("proj_checks", world.projectile_checks)
+        self._delta("npc_updates", world.npc_updates)
+        self._delta("fsm_events", world.events.delivered)
+        self._delta("los_traces", world.los.traces)
+        if world.flow is not None:
+            self._delta("flow_builds", world.flow.builds)
+
+    def _delta(self, name, value):
+        last = self._last.get(name)
+        self._last[name] = value
+        # first sample, or a new world after reset: nothing to diff against
+        if last is None or value < last:
+            return
+        self.counts[name] = self.counts.get(name, 0) + value - last
+
+    def end_frame(self, frame_ms):
+        self.frame_ms.append(frame_ms)
+        for name, v in self.frame.items():
+            self._push(name, v)
+        for name, v in self.counts.items():
+            self._push(name, v)
+        self.frame = {}
+        self.counts = {}
+
+    def _push(self, name, v):
+        h = self.history.get(name)
+        if h is None:
+            h = self.history[name] = deque(maxlen=self.window)
+        h.append(v)
+
+    def reset(self):
+        self.frame = {}
+        self.counts = {}
+        self.history = {}
+        self.frame_ms.clear()
+        self._last = {}
+
+    # ---------------------------------------
+    # STATS
+    # ---------------------------------------
+    def average(self, name):
+        h = self.history.get(name)
+        if not h:
+            return 0.0
+        return sum(h) / len(h)
+
+    def frame_avg(self):
+        if not self.frame_ms:
+            return 0.0
+        return sum(self.frame_ms) / len(self.frame_ms)
+
+    def frame_p99(self):
+        if not self.frame_ms:
+            return 0.0
+        s = sorted(self.frame_ms)
+        return s[min(len(s) - 1, int(len(s) * 0.99))]
@@ -1,6 +1,12 @@
 import pygame
+import numpy as np
+
+from spatial import CellIndex
+from fsm import HEALTH
 
 class Projectile:
+    __slots__ = ("pos", "vel", "damage", "owner", "radius")
+
     def __init__(self, pos, vel, dmg, owner):
         self.pos = pos[:]
         self.vel = vel
@@ -22,6 +28,7 @@ class Projectile:
             for n in world.npcs:
                 if n.alive and (n.pos[0]-self.pos[0])**2 + (n.pos[1]-self.pos[1])**2 < 400:
                     n.health -= self.damage
+                    world.events.emit(HEALTH, n)
                     return False
         else:
             p = world.player
@@ -30,3 +37,137 @@ class Projectile:
                 return False
 
         return True
+
+
+# ---------------------------------------
+# BATCHED STORE
+# structure of arrays, one collision pass per tick; Projectile above stays
+# as the per-object reference
+# ---------------------------------------
+HIT_RADIUS = 20.0        # (dx^2 + dy^2 < 400) as in Projectile.update
+CULL_MARGIN = 64         # bullets this far outside the map are dropped
+DENSE_PAIRS = 4096       # below this many bullet x NPC pairs, skip the index
+
+
+class ProjectileStore:
+    def __init__(self, capacity=256):
+        self.n = 0
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.vel = np.zeros((capacity, 2), dtype=np.float64)
+        self.from_player = np.zeros(capacity, dtype=bool)
+        self.damage = []
+        self.owner = []
+        self.spawned = 0      # total ever spawned (stats)
+
+    def __len__(self):
+        return self.n
+
+    def positions(self):
+        return self.pos[:self.n]
+
+    def _grow(self):
+        cap = self.capacity * 2
+        for name in ("pos", "vel", "from_player"):
+            old = getattr(self, name)
+            new = np.zeros((cap,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+        self.capacity = cap
+
+    def spawn(self, pos, vel, dmg, owner):
+        if self.n == self.capacity:
+            self._grow()
+        i = self.n
+        self.pos[i] = pos
+        self.vel[i] = vel
+        self.from_player[i] = owner.__class__.__name__ == "Player"
+        self.damage.append(dmg)
+        self.owner.append(owner)
+        self.n += 1
+        self.spawned += 1
+
+    def clear(self):
+        self.n = 0
+        self.damage = []
+        self.owner = []
+
+    def update(self, dt, world):
+        # move, then walls, then hits; returns the number of hit tests done
+        n = self.n
+        if n == 0:
+            return 0
+        pos = self.pos[:n]
+        pos += self.vel[:n] * dt
+
+        # colide com parede / saiu do mapa
+        dead = world.occupancy.contains_many(pos)
+        dead |= (pos[:, 0] < -CULL_MARGIN) | (pos[:, 0] > world.map_w + CULL_MARGIN)
+        dead |= (pos[:, 1] < -CULL_MARGIN) | (pos[:, 1] > world.map_h + CULL_MARGIN)
+        live = ~dead
+        damage = self.damage
+        checks = 0
+
+        # player bullets vs alive NPCs: first NPC (in world.npcs order) hit
+        pb = np.nonzero(live & self.from_player[:n])[0]
+        if len(pb):
+            npcs = world.npcs
+            targets = [i for i, npc in enumerate(npcs) if npc.alive]
+            if targets:
+                npos = np.array([npcs[i].pos for i in targets], dtype=np.float64)
+                if len(pb) * len(targets) <= DENSE_PAIRS:
+                    # few pairs: test all of them, skip building the index
+                    qi = np.repeat(np.arange(len(pb)), len(targets))
+                    j = np.tile(np.arange(len(targets)), len(pb))
+                else:
+                    qi, j = CellIndex(npos, HIT_RADIUS).pairs(pos[pb])
+                checks += len(qi)
+                d = pos[pb[qi]] - npos[j]
+                hit = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] < HIT_RADIUS * HIT_RADIUS
+                qi, j = qi[hit], j[hit]
+                if len(qi):
+                    order = np.lexsort((j, qi))
+                    qi, j = qi[order], j[order]
+                    first = np.ones(len(qi), dtype=bool)
+                    first[1:] = qi[1:] != qi[:-1]
+                    emit = world.events.emit
+                    for b, k in zip(pb[qi[first]].tolist(), j[first].tolist()):
+                        hit_npc = npcs[targets[k]]
+                        hit_npc.health -= damage[b]
+                        emit(HEALTH, hit_npc)
+                        dead[b] = True
+
+        # enemy bullets vs player
+        eb = np.nonzero(live & ~self.from_player[:n])[0]
+        if len(eb):
+            p = world.player
+            checks += len(eb)
+            d = pos[eb] - p.pos
+            hit = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] < HIT_RADIUS * HIT_RADIUS
+            for b in eb[hit].tolist():
+                p.damage(damage[b])
+                dead[b] = True
+
+        if dead.any():
+            self._swap_remove(np.nonzero(dead)[0])
+        return checks
+
+    def _swap_remove(self, dead):
+        # fill holes below the new length with survivors from the tail
+        n = self.n
+        k = n - len(dead)
+        holes = dead[dead < k]
+        if len(holes):
+            tail = np.ones(n - k, dtype=bool)
+            tail[dead[dead >= k] - k] = False
+            movers = np.nonzero(tail)[0] + k
+            self.pos[holes] = self.pos[movers]
+            self.vel[holes] = self.vel[movers]
+            self.from_player[holes] = self.from_player[movers]
+            damage, owner = self.damage, self.owner
+            for h, m in zip(holes.tolist(), movers.tolist()):
+                damage[h] = damage[m]
+                owner[h] = owner[m]
+        del self.damage[k:]
+        del self.owner[k:]
+        self.n = k
@@ -0,0 +1,234 @@
+# render.py
+# Render caches: fonts, text surfaces and the pre-rendered static map layer
+# (background, debug grid, obstacles, in chunks) that main.py blits per frame.
+from collections import OrderedDict
+
+import pygame
+
+BG_COLOR = (18,18,28)
+GRID_COLOR = (22,22,30)
+OBSTACLE_COLOR = (60,60,80)
+
+
+class FontCache:
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size):
+        f = self.fonts.get(size)
+        if f is None:
+            f = self.fonts[size] = pygame.font.SysFont(None, size)
+        return f
+
+
+class TextCache:
+    # one cached surface per slot, re-rendered only when its text changes
+    def __init__(self, fonts):
+        self.fonts = fonts
+        self.slots = {}
+
+    def get(self, slot, text, size, color):
+        hit = self.slots.get(slot)
+        if hit is not None and hit[0] == text and hit[1] == color:
+            return hit[2]
+        surf = self.fonts.get(size).render(text, True, color)
+        self.slots[slot] = (text, color, surf)
+        return surf
+
+
+class LabelCache:
+    # fixed strings (FSM state names, banners) rendered once
+    def __init__(self, fonts):
+        self.fonts = fonts
+        self.labels = {}
+
+    def get(self, text, size, color):
+        key = (text, size, color)
+        surf = self.labels.get(key)
+        if surf is None:
+            surf = self.labels[key] = self.fonts.get(size).render(text, True, color)
+        return surf
+
+
+class StaticLayer:
+    # the map pre-rendered in CHUNK_TILES x CHUNK_TILES tile chunks, drawn on
+    # demand for the view and kept (up to MAX_CHUNKS, least recently used
+    # dropped) across frames and game resets while the map stays the same
+    CHUNK_TILES = 16
+    MAX_CHUNKS = 32
+
+    def __init__(self):
+        self.chunks = OrderedDict()   # (cx, cy) -> surface
+        self.key = None
+        self.world = None
+        self.version = None
+        self.chunk = 0
+
+    def _sync(self, world):
+        if self.world is world and self.version == world.grid_version:
+            return
+        # a new World on the same baked map (main.py reset) keeps the chunks
+        if world.baked is not None:
+            key = world.baked
+        else:
+            key = (world.map_w, world.map_h, world.tile, tuple(tuple(r) for r in world.obstacles))
+        if key != self.key:
+            self.chunks.clear()
+            self.key = key
+            self.chunk = world.tile * self.CHUNK_TILES
+        self.world = world
+        self.version = world.grid_version
+
+    def _build(self, world, cx, cy):
+        # same pixels as the matching part of a whole-map surface
+        size = self.chunk
+        tile = world.tile
+        x0 = cx * size
+        y0 = cy * size
+        surf = pygame.Surface((min(size, world.map_w - x0), min(size, world.map_h - y0))).convert()
+        surf.fill(BG_COLOR)
+        for ix in range(x0 // tile, x0 // tile + self.CHUNK_TILES):
+            for iy in range(y0 // tile, y0 // tile + self.CHUNK_TILES):
+                pygame.draw.rect(surf, GRID_COLOR, (ix*tile - x0, iy*tile - y0, tile, tile), 1)
+        area = pygame.Rect(x0, y0, size, size)
+        for i in area.collidelistall(world.obstacles):
+            pygame.draw.rect(surf, OBSTACLE_COLOR, world.obstacles[i].move(-x0, -y0))
+        return surf
+
+    def draw(self, screen, world, camx, camy):
+        self._sync(world)
+        vw, vh = screen.get_size()
+        x0 = int(camx - vw//2)
+        y0 = int(camy - vh//2)
+        if x0 < 0 or y0 < 0 or x0 + vw > world.map_w or y0 + vh > world.map_h:
+            screen.fill(BG_COLOR)
+        size = self.chunk
+        chunks = self.chunks
+        batch = []
+        for cx in range(max(0, x0) // size, (min(x0 + vw, world.map_w) - 1) // size + 1):
+            for cy in range(max(0, y0) // size, (min(y0 + vh, world.map_h) - 1) // size + 1):
+                surf = chunks.get((cx, cy))
+                if surf is None:
+                    surf = chunks[(cx, cy)] = self._build(world, cx, cy)
+                else:
+                    chunks.move_to_end((cx, cy))
+                batch.append((surf, (cx * size - x0, cy * size - y0)))
+        screen.blits(batch, doreturn=False)
+        while len(chunks) > self.MAX_CHUNKS:
+            chunks.popitem(last=False)
+
+
+fonts = FontCache()
+texts = TextCache(fonts)
+labels = LabelCache(fonts)
+
+
+# ---------------------------------------
+# ENTITIES
+# view culling + pre-rendered sprites drawn with one Surface.blits call
+# ---------------------------------------
+HEART_COLOR = (255,60,120)
+PROJECTILE_COLOR = (255,200,60)
+DEAD_COLOR = (70,70,70)
+LABEL_COLOR = (200,200,200)
+STATE_OUTLINE = {"Patrol": (0,180,0), "Engage": (255,255,0)}
+OTHER_OUTLINE = (255,80,80)
+HP_BAR_W = 34
+CULL_MARGIN = 48   # NPC radius + HP bar + state label above it
+
+
+def circle_sprite(color, radius, outline=None):
+    # same pixels as pygame.draw.circle centered at (radius, radius)
+    size = radius * 2 + 1
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(surf, color, (radius, radius), radius)
+    if outline is not None:
+        pygame.draw.circle(surf, outline, (radius, radius), radius, 2)
+    return surf
+
+
+class SpriteCache:
+    def __init__(self):
+        self.circles = {}
+        self.bars = {}
+
+    def circle(self, color, radius, outline=None):
+        key = (color, radius, outline)
+        surf = self.circles.get(key)
+        if surf is None:
+            surf = self.circles[key] = circle_sprite(color, radius, outline)
+        return surf
+
+    def hp_bar(self, filled):
+        # background + filled part in one surface, one per fill width
+        surf = self.bars.get(filled)
+        if surf is None:
+            surf = pygame.Surface((HP_BAR_W, 5))
+            surf.fill((30,30,30))
+            if filled > 0:
+                surf.fill((0,200,0), (0, 0, filled, 5))
+            self.bars[filled] = surf
+        return surf
+
+
+class EntityRenderer:
+    def __init__(self):
+        self.sprites = SpriteCache()
+        self.visible = 0
+
+    def draw(self, screen, world, camx, camy, interp=None):
+        # interp: timestep.Interpolation, to draw between fixed sim steps
+        vw, vh = screen.get_size()
+        ox = vw//2 - camx
+        oy = vh//2 - camy
+        x0 = camx - vw//2 - CULL_MARGIN
+        y0 = camy - vh//2 - CULL_MARGIN
+        x1 = camx + vw//2 + CULL_MARGIN
+        y1 = camy + vh//2 + CULL_MARGIN
+        sprites = self.sprites
+        batch = []
+
+        # hearts
+        heart = sprites.circle(HEART_COLOR, 8)
+        for hx, hy in world.hearts:
+            if x0 <= hx <= x1 and y0 <= hy <= y1:
+                batch.append((heart, (int(hx + ox) - 8, int(hy + oy) - 8)))
+
+        # projectiles
+        if interp is not None:
+            pos = interp.projectile_positions(world.projectiles)
+        else:
+            pos = world.projectiles.positions()
+        if len(pos):
+            inside = (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+            bullet = sprites.circle(PROJECTILE_COLOR, 4)
+            for px, py in pos[inside].tolist():
+                batch.append((bullet, (int(px + ox) - 4, int(py + oy) - 4)))
+
+        # NPCs in the camera rect, in world.npcs order
+        npcs = world.npcs
+        for i in world.npc_hash.query_rect(x0, y0, x1, y1):
+            n = npcs[i]
+            px, py = n.pos if interp is None else interp.npc_pos(n)
+            if not (x0 <= px <= x1 and y0 <= py <= y1):
+                continue
+            sx = int(px + ox)
+            sy = int(py + oy)
+            r = n.radius
+            if not n.alive:
+                batch.append((sprites.circle(DEAD_COLOR, r), (sx - r, sy - r)))
+                continue
+            color = getattr(n.__class__, "COLOR", (200,60,60))
+            state_name = n.fsm.current.__class__.__name__ if n.fsm.current else "?"
+            outline = STATE_OUTLINE.get(state_name, OTHER_OUTLINE)
+            batch.append((sprites.circle(color, r, outline), (sx - r, sy - r)))
+            # HP bar
+            hx = sx - HP_BAR_W//2
+            hy = sy - r - 12
+            pct = max(0.0, min(1.0, n.health / 220.0))
+            batch.append((sprites.hp_bar(int(HP_BAR_W*pct)), (hx, hy)))
+            txt = labels.get(state_name, 14, LABEL_COLOR)
+            batch.append((txt, (sx - txt.get_width()//2, hy - 16)))
+
+        self.visible = len(batch)
+        screen.blits(batch, doreturn=False)
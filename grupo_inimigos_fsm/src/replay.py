@@ -0,0 +1,230 @@
+# replay.py
+# Compact binary replays: seed + config + per-tick player input, played back
+# deterministically through HeadlessRunner (max speed, optional rendering).
+#   python main.py --record session.rpl
+#   python replay.py session.rpl                 # headless, reports timing
+#   python replay.py session.rpl --render --fps 60
+#   python replay.py session.rpl --profile       # cProfile the playback
+#
+# File layout (little endian):
+#   header  "GRPL", version u16, seed u32, npc_count u32, dt f64, ticks u32,
+#           digest u32, config_len u32, body_len u32
+#   config  JSON of every upper-case config value at record time
+#   body    zlib of one TICK record per simulated tick
+# digest is a CRC of the final world state, checked after playback.
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import config
+
+MAGIC = b"GRPL"
+VERSION = 1
+HEADER = struct.Struct("<4sHIIdIIII")
+TICK = struct.Struct("<Hhhdd")     # keys+fire bits, mouse (screen), camera
+
+# pygame.K_* codes in bit order (the keys Player.update reads); looked up
+# lazily so the CLI can patch config before anything imports pygame
+KEY_NAMES = ["K_w", "K_a", "K_s", "K_d", "K_UP", "K_LEFT", "K_DOWN", "K_RIGHT", "K_SPACE", "K_e"]
+FIRE_BIT = 1 << 15
+
+
+def _key_codes():
+    import pygame
+    return [getattr(pygame, name) for name in KEY_NAMES]
+
+
+def config_values():
+    # the part of config.py a replay depends on
+    out = {}
+    for k in dir(config):
+        v = getattr(config, k)
+        if k.isupper() and isinstance(v, (bool, int, float, str)):
+            out[k] = v
+    return out
+
+
+def state_digest(world, player):
+    vals = array("d", [player.hp, player.pos[0], player.pos[1], len(world.projectiles)])
+    for n in world.npcs:
+        vals.extend((n.pos[0], n.pos[1], n.vel[0], n.vel[1], n.health, float(n.alive)))
+    return zlib.crc32(vals.tobytes())
+
+
+class Recorder:
+    def __init__(self, seed, npc_count, dt):
+        self.seed = seed
+        self.npc_count = npc_count
+        self.dt = dt
+        self.config = config_values()
+        self.body = bytearray()
+        self.ticks = 0
+        self.codes = _key_codes()
+
+    def add(self, keys, mouse, camx, camy, fire):
+        bits = FIRE_BIT if fire else 0
+        for b, code in enumerate(self.codes):
+            if keys[code]:
+                bits |= 1 << b
+        self.body += TICK.pack(bits, mouse[0], mouse[1], camx, camy)
+        self.ticks += 1
+
+    def save(self, path, world, player):
+        cfg = json.dumps(self.config, sort_keys=True).encode()
+        body = zlib.compress(bytes(self.body), 9)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, self.npc_count, self.dt, self.ticks,
+                                state_digest(world, player), len(cfg), len(body)))
+            f.write(cfg)
+            f.write(body)
+
+
+class Replay:
+    def __init__(self, seed, npc_count, dt, ticks, digest, config, body):
+        self.seed = seed
+        self.npc_count = npc_count
+        self.dt = dt
+        self.ticks = ticks
+        self.digest = digest
+        self.config = config
+        self.body = body           # uncompressed TICK records
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, npc_count, dt, ticks, digest, cfg_len, body_len = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a replay file")
+        if version != VERSION:
+            raise ValueError(f"{path}: replay version {version}, expected {VERSION}")
+        pos = HEADER.size
+        cfg = json.loads(data[pos:pos + cfg_len])
+        pos += cfg_len
+        body = zlib.decompress(data[pos:pos + body_len])
+        if len(body) != ticks * TICK.size:
+            raise ValueError(f"{path}: truncated replay")
+        return cls(seed, npc_count, dt, ticks, digest, cfg, body)
+
+    def apply_config(self):
+        # must run before the game modules are imported (they copy values)
+        for k, v in self.config.items():
+            setattr(config, k, v)
+
+    def config_mismatch(self):
+        # recorded values that differ from the running config
+        current = config_values()
+        return sorted(k for k, v in self.config.items() if current.get(k) != v)
+
+    def frame(self, tick):
+        return TICK.unpack_from(self.body, tick * TICK.size)
+
+
+class ReplayInput:
+    # input source for HeadlessRunner; sets .camera so the player sees the
+    # exact mouse/camera pair it saw live
+    def __init__(self, replay):
+        from headless import Keys
+        self.replay = replay
+        self.Keys = Keys
+        self.codes = _key_codes()
+        self.camera = None
+
+    def poll(self, tick, world, player):
+        bits, mx, my, camx, camy = self.replay.frame(tick)
+        pressed = [code for b, code in enumerate(self.codes) if bits & (1 << b)]
+        self.camera = (camx, camy)
+        return self.Keys(pressed), (mx, my), bool(bits & FIRE_BIT)
+
+
+def play(replay, render=False, fps=0, on_tick=None):
+    # returns (runner, ticks run); on_tick(runner) is called after each tick
+    from headless import HeadlessRunner, _quiet
+    runner = HeadlessRunner(replay.seed, replay.npc_count, replay.dt, ReplayInput(replay))
+    view = _Viewer(fps) if render else None
+    with _quiet(True):
+        for _ in range(replay.ticks):
+            runner.step()
+            if on_tick is not None:
+                on_tick(runner)
+            if view is not None and not view.draw(runner):
+                break
+    if view is not None:
+        view.close()
+    return runner, runner.tick
+
+
+class _Viewer:
+    # draws each played tick with the game's renderers, from the recorded camera
+    def __init__(self, fps):
+        import pygame
+        from render import StaticLayer, EntityRenderer
+        pygame.init()
+        self.pygame = pygame
+        self.screen = pygame.display.set_mode((config.VIEW_W, config.VIEW_H))
+        pygame.display.set_caption("Replay")
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.static_layer = StaticLayer()
+        self.entities = EntityRenderer()
+
+    def draw(self, runner):
+        from hud import draw_hud
+        pygame = self.pygame
+        for ev in pygame.event.get():
+            if ev.type == pygame.QUIT:
+                return False
+        world, player = runner.world, runner.player
+        camx, camy = runner.inputs.camera
+        self.static_layer.draw(self.screen, world, camx, camy)
+        self.entities.draw(self.screen, world, camx, camy)
+        px = int(player.pos[0] - camx + config.VIEW_W // 2)
+        py = int(player.pos[1] - camy + config.VIEW_H // 2)
+        pygame.draw.circle(self.screen, (50,160,255), (px, py), player.radius)
+        draw_hud(self.screen, world, player)
+        pygame.display.flip()
+        if self.fps:
+            self.clock.tick(self.fps)
+        return True
+
+    def close(self):
+        self.pygame.quit()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Play back a recorded session.")
+    ap.add_argument("path")
+    ap.add_argument("--render", action="store_true", help="draw every tick")
+    ap.add_argument("--fps", type=int, default=0, help="cap the render rate (0 = max speed)")
+    ap.add_argument("--profile", action="store_true", help="run under cProfile, print the top 25")
+    args = ap.parse_args()
+
+    replay = Replay.load(args.path)
+    replay.apply_config()
+
+    t = time.perf_counter()
+    if args.profile:
+        import cProfile
+        import pstats
+        prof = cProfile.Profile()
+        runner, ticks = prof.runcall(play, replay, args.render, args.fps)
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(25)
+    else:
+        runner, ticks = play(replay, args.render, args.fps)
+    elapsed = time.perf_counter() - t
+
+    print(f"ticks: {ticks}/{replay.ticks}  elapsed: {elapsed:.3f}s  "
+          f"speedup: {ticks * replay.dt / max(elapsed, 1e-9):.1f}x real time")
+    if ticks == replay.ticks:
+        ok = state_digest(runner.world, runner.player) == replay.digest
+        print("final state:", "matches the recording" if ok else "DIVERGED from the recording")
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
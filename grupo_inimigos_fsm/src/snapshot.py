@@ -0,0 +1,231 @@
+# snapshot.py
+# Save/restore the full simulation state (NPCs, projectiles, hearts, player,
+# optionally the global RNG) to a compact binary buffer. restore() writes
+# into an existing World, so the grid, occupancy and path data structures
+# built by its constructor are reused instead of rebuilt.
+#   buf = snapshot.save(world, player)
+#   ...
+#   snapshot.restore(world, player, buf)   # back to the saved tick
+import random
+import struct
+from array import array
+
+import numpy as np
+import pygame
+
+from npc import Brute, Shooter, Support
+from fsm import PATROL, ENGAGE, RETREAT, DEAD, PLAYER_IN_RANGE, HEALTH, ALLY_DIED
+
+MAGIC = b"GWSN"
+VERSION = 3
+HAS_RNG = 1
+
+HEADER = struct.Struct("<4sHIIIIIBI")   # magic, version, npcs, projectiles, hearts, obstacles, path words, flags, lod tick
+PLAYER = struct.Struct("<dddddBdddI")   # pos, vel, hp, alive, dash/emp/shoot cd, shots fired
+NPC = struct.Struct("<BBB13diihh")      # class, state, flags, 13 floats, path idx/len, path goal
+RNG_TAIL = struct.Struct("<Bd")         # has gauss_next, gauss_next
+
+NPC_CLASSES = [Brute, Shooter, Support]
+STATES = [PATROL, ENGAGE, RETREAT, DEAD]
+EVENTS = [PLAYER_IN_RANGE, HEALTH, ALLY_DIED]
+CLASS_ID = {c: i for i, c in enumerate(NPC_CLASSES)}
+STATE_ID = {s: i for i, s in enumerate(STATES)}
+EVENT_ID = {e: i for i, e in enumerate(EVENTS)}
+EXTRA_CD = {Shooter: "shoot_cd", Support: "heal_cd"}   # per-class cooldown slot
+
+ALIVE = 1
+PENDING = 2     # waiting on world.path_queue
+HAS_GOAL = 4
+OWNER_PLAYER = -1
+OWNER_NONE = -2
+
+
+def save(world, player, rng=True):
+    npcs = world.npcs
+    queue = world.path_queue
+    records = bytearray()
+    paths = array("H")
+    for n in npcs:
+        flags = ALIVE if n.alive else 0
+        if n.path_pending:
+            flags |= PENDING
+        goal = n.path_goal
+        if goal is not None:
+            flags |= HAS_GOAL
+        else:
+            goal = (0, 0)
+        path = n.path
+        if path is None:
+            plen = -1
+        else:
+            plen = len(path)
+            for x, y in path:
+                paths.append(x)
+                paths.append(y)
+        extra = EXTRA_CD.get(n.__class__)
+        state = n.fsm.current
+        records += NPC.pack(
+            CLASS_ID[n.__class__], STATE_ID[state] if state is not None else 255, flags,
+            n.pos[0], n.pos[1], n.vel[0], n.vel[1], n.health, n.max_speed,
+            n.charge_cd, n.stunned, n.next_replan, n.lod_dt,
+            n.patrol_target[0], n.patrol_target[1],
+            getattr(n, extra) if extra else 0.0,
+            n.path_idx, plen, goal[0], goal[1],
+        )
+
+    store = world.projectiles
+    k = store.n
+    owners = array("i", [
+        OWNER_PLAYER if o is player else (o.idx if o is not None else OWNER_NONE)
+        for o in store.owner
+    ])
+    hearts = array("d")
+    for h in world.hearts:
+        hearts.append(h[0])
+        hearts.append(h[1])
+    obstacles = array("i")
+    for r in world.obstacles:
+        obstacles.extend((r.x, r.y, r.w, r.h))
+    pending = array("i", [n.idx for n in queue.pending]) if queue is not None else array("i")
+    events = array("i")
+    for event, n in world.events.queue:
+        events.append(EVENT_ID[event])
+        events.append(n.idx)
+    squads = world.squads
+    squad_of = array("i", squads.of) if squads is not None else array("i")
+
+    out = bytearray(HEADER.pack(
+        MAGIC, VERSION, len(npcs), k, len(world.hearts), len(world.obstacles), len(paths),
+        HAS_RNG if rng else 0, world.lod.tick if world.lod is not None else 0,
+    ))
+    out += PLAYER.pack(
+        player.pos[0], player.pos[1], player.vel[0], player.vel[1], player.hp, player.alive,
+        player.dash_cd, player.emp_cd, player.shoot_cd, player.shots_fired,
+    )
+    out += obstacles.tobytes()
+    out += hearts.tobytes()
+    out += records
+    out += paths.tobytes()
+    out += struct.pack("<I", len(pending)) + pending.tobytes()
+    out += struct.pack("<I", len(events)) + events.tobytes()
+    out += struct.pack("<II", squads.tick if squads is not None else 0, len(squad_of)) + squad_of.tobytes()
+    out += store.pos[:k].tobytes() + store.vel[:k].tobytes() + store.from_player[:k].tobytes()
+    out += array("d", store.damage).tobytes() + owners.tobytes()
+    if rng:
+        version, internal, gauss = random.getstate()
+        out += array("I", internal).tobytes()
+        out += RNG_TAIL.pack(gauss is not None, gauss or 0.0)
+    return bytes(out)
+
+
+def restore(world, player, buf):
+    mv = memoryview(buf)
+    magic, version, n_npcs, k, n_hearts, n_obs, n_path, flags, lod_tick = HEADER.unpack_from(mv)
+    if magic != MAGIC:
+        raise ValueError("not a world snapshot")
+    if version != VERSION:
+        raise ValueError(f"snapshot version {version}, expected {VERSION}")
+    pos = HEADER.size
+
+    (px, py, pvx, pvy, player.hp, alive, player.dash_cd, player.emp_cd,
+     player.shoot_cd, player.shots_fired) = PLAYER.unpack_from(mv, pos)
+    pos += PLAYER.size
+    player.pos[0], player.pos[1] = px, py
+    player.vel[0], player.vel[1] = pvx, pvy
+    player.alive = bool(alive)
+
+    obstacles, pos = _take(mv, pos, "i", n_obs * 4)
+    rects = [tuple(obstacles[i:i + 4]) for i in range(0, len(obstacles), 4)]
+    if rects != [tuple(r) for r in world.obstacles]:
+        world.set_obstacles([pygame.Rect(r) for r in rects])
+
+    hearts, pos = _take(mv, pos, "d", n_hearts * 2)
+    world.hearts = [[hearts[i], hearts[i + 1]] for i in range(0, len(hearts), 2)]
+
+    # NPCs: reuse objects of the right class, build the others
+    old = world.npcs
+    npcs = []
+    records = mv[pos:pos + n_npcs * NPC.size]
+    pos += n_npcs * NPC.size
+    paths, pos = _take(mv, pos, "H", n_path)
+    p = 0
+    for i, rec in enumerate(NPC.iter_unpack(records)):
+        cls = NPC_CLASSES[rec[0]]
+        n = old[i] if i < len(old) and old[i].__class__ is cls else cls(world, rec[3], rec[4])
+        n.fsm.current = STATES[rec[1]] if rec[1] != 255 else None
+        f = rec[2]
+        n.alive = bool(f & ALIVE)
+        n.path_pending = False
+        n.path_future = None
+        n.future_goal = None
+        n.pos[0], n.pos[1], n.vel[0], n.vel[1] = rec[3:7]
+        (n.health, n.max_speed, n.charge_cd, n.stunned, n.next_replan, n.lod_dt) = rec[7:13]
+        n.patrol_target = [rec[13], rec[14]]
+        extra = EXTRA_CD.get(cls)
+        if extra:
+            setattr(n, extra, rec[15])
+        n.path_idx = rec[16]
+        plen = rec[17]
+        if plen < 0:
+            n.path = None
+        else:
+            n.path = [(paths[p + 2 * j], paths[p + 2 * j + 1]) for j in range(plen)]
+            p += 2 * plen
+        n.path_goal = (rec[18], rec[19]) if f & HAS_GOAL else None
+        npcs.append(n)
+    world.set_npcs(npcs)
+
+    # path requests still queued, in their original order
+    (n_pending,) = struct.unpack_from("<I", mv, pos)
+    pos += 4
+    pending, pos = _take(mv, pos, "i", n_pending)
+    queue = world.path_queue
+    if queue is not None:
+        queue.pending = {}
+        for i in pending:
+            queue.request(npcs[i])
+
+    # FSM events raised during the last dispatch, due at the next one
+    (n_events,) = struct.unpack_from("<I", mv, pos)
+    pos += 4
+    events, pos = _take(mv, pos, "i", n_events)
+    world.events.queue = [(EVENTS[events[i]], npcs[events[i + 1]]) for i in range(0, n_events, 2)]
+
+    # squad grouping (regrouped only every few ticks)
+    squad_tick, n_squad = struct.unpack_from("<II", mv, pos)
+    pos += 8
+    squad_of, pos = _take(mv, pos, "i", n_squad)
+    if world.squads is not None:
+        world.squads.load(squad_tick, squad_of)
+
+    store = world.projectiles
+    while store.capacity < k:
+        store._grow()
+    store.n = k
+    store.pos[:k] = np.frombuffer(mv[pos:pos + 16 * k], dtype=np.float64).reshape(k, 2)
+    pos += 16 * k
+    store.vel[:k] = np.frombuffer(mv[pos:pos + 16 * k], dtype=np.float64).reshape(k, 2)
+    pos += 16 * k
+    store.from_player[:k] = np.frombuffer(mv[pos:pos + k], dtype=bool)
+    pos += k
+    damage, pos = _take(mv, pos, "d", k)
+    owners, pos = _take(mv, pos, "i", k)
+    store.damage = damage.tolist()
+    store.owner = [player if o == OWNER_PLAYER else (npcs[o] if o >= 0 else None) for o in owners]
+
+    if world.lod is not None:
+        world.lod.tick = lod_tick
+    if world.batch_steering is not None:
+        world.batch_steering.requests = []
+
+    if flags & HAS_RNG:
+        internal, pos = _take(mv, pos, "I", 625)
+        has_gauss, gauss = RNG_TAIL.unpack_from(mv, pos)
+        random.setstate((3, tuple(internal), gauss if has_gauss else None))
+
+
+def _take(mv, pos, code, count):
+    a = array(code)
+    end = pos + count * a.itemsize
+    a.frombytes(mv[pos:end])
+    return a, end
@@ -0,0 +1,130 @@
+# spatial.py
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    # uniform grid of buckets; stores integer ids (index in world.npcs)
+    def __init__(self, cell):
+        self.cell = cell
+        self.buckets = {}
+        self.where = {}
+
+    def _key(self, pos):
+        return (int(math.floor(pos[0] / self.cell)), int(math.floor(pos[1] / self.cell)))
+
+    def clear(self):
+        self.buckets.clear()
+        self.where.clear()
+
+    def insert(self, i, pos):
+        k = self._key(pos)
+        self.buckets.setdefault(k, []).append(i)
+        self.where[i] = k
+
+    def remove(self, i):
+        k = self.where.pop(i, None)
+        if k is None:
+            return
+        b = self.buckets[k]
+        b.remove(i)
+        if not b:
+            del self.buckets[k]
+
+    def move(self, i, pos):
+        # re-bucket only when the cell changed
+        k = self._key(pos)
+        old = self.where.get(i)
+        if old == k:
+            return
+        if old is not None:
+            b = self.buckets[old]
+            b.remove(i)
+            if not b:
+                del self.buckets[old]
+        self.buckets.setdefault(k, []).append(i)
+        self.where[i] = k
+
+    def rebuild(self, items):
+        self.clear()
+        for i, pos in items:
+            self.insert(i, pos)
+
+    def candidates(self, pos, radius):
+        # ids in every bucket overlapping the query circle's bounding box
+        c = self.cell
+        x0 = int(math.floor((pos[0] - radius) / c))
+        x1 = int(math.floor((pos[0] + radius) / c))
+        y0 = int(math.floor((pos[1] - radius) / c))
+        y1 = int(math.floor((pos[1] + radius) / c))
+        out = []
+        buckets = self.buckets
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                b = buckets.get((cx, cy))
+                if b:
+                    out.extend(b)
+        return out
+
+    def query_rect(self, x0, y0, x1, y1):
+        # sorted ids in every bucket overlapping the rect (callers refine)
+        c = self.cell
+        out = []
+        buckets = self.buckets
+        for cx in range(int(math.floor(x0 / c)), int(math.floor(x1 / c)) + 1):
+            for cy in range(int(math.floor(y0 / c)), int(math.floor(y1 / c)) + 1):
+                b = buckets.get((cx, cy))
+                if b:
+                    out.extend(b)
+        out.sort()
+        return out
+
+
+class CellIndex:
+    # numpy counterpart of SpatialHash for batch queries: points sorted by
+    # cell key, rebuilt from scratch each time (build is O(n log n))
+    def __init__(self, pos, cell):
+        self.cell = cell
+        self.pos = pos
+        if len(pos) == 0:
+            self.origin = np.zeros(2, dtype=np.int64)
+            self.ny = 1
+            self.order = np.zeros(0, dtype=np.intp)
+            self.skey = np.zeros(0, dtype=np.int64)
+            return
+        c = np.floor(pos / cell).astype(np.int64)
+        self.origin = c.min(axis=0) - 1
+        c -= self.origin
+        self.ny = int(c[:, 1].max()) + 2
+        key = c[:, 0] * self.ny + c[:, 1]
+        self.order = np.argsort(key, kind="stable")
+        self.skey = key[self.order]
+
+    def pairs(self, qpos):
+        # (query row, point index) for every point in the 3x3 block of cells
+        # around each query; callers filter by exact distance (radius <= cell)
+        empty = np.zeros(0, dtype=np.intp)
+        if len(qpos) == 0 or len(self.skey) == 0:
+            return empty, empty
+        c = np.floor(qpos / self.cell).astype(np.int64) - self.origin
+        # queries outside the indexed area can't match anything
+        ok = (c[:, 0] >= 0) & (c[:, 1] >= 0) & (c[:, 1] < self.ny)
+        qkey = np.where(ok, c[:, 0] * self.ny + c[:, 1], -10)
+        m = len(qpos)
+        qs, js = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                k = qkey + (dx * self.ny + dy)
+                lo = np.searchsorted(self.skey, k, "left")
+                hi = np.searchsorted(self.skey, k, "right")
+                cnt = np.where(ok, hi - lo, 0)
+                total = int(cnt.sum())
+                if total == 0:
+                    continue
+                first = np.repeat(lo - (np.cumsum(cnt) - cnt), cnt)
+                qs.append(np.repeat(np.arange(m), cnt))
+                js.append(self.order[first + np.arange(total)])
+        if not qs:
+            return empty, empty
+        return np.concatenate(qs), np.concatenate(js)
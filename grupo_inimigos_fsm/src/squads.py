@@ -0,0 +1,156 @@
+# squads.py
+# World.squads: NPCs grouped into squads of nearby allies. Every SQUAD_REGROUP
+# ticks the alive NPCs are regrouped greedily in index order: each NPC not
+# yet placed leads a new squad and takes the unplaced NPCs within
+# SQUAD_RADIUS of it, up to SQUAD_MAX members. Every tick the members'
+# position and velocity sums are taken once per squad (one bincount pass
+# over the perception positions), and cohesion/alignment read them instead
+# of averaging a neighbor list per NPC. Broadcasts (an ally's death,
+# spotting the player with SQUAD_ALERT, World.broadcast_*) reach one squad,
+# not the whole world.
+from itertools import chain
+
+import numpy as np
+
+from steering import seek
+from config import SQUAD_RADIUS, SQUAD_MAX, SQUAD_REGROUP
+
+COHESION_SPEED = 40
+
+
+class SquadManager:
+    def __init__(self, world, radius=SQUAD_RADIUS, max_size=SQUAD_MAX, regroup=SQUAD_REGROUP):
+        self.world = world
+        self.radius = radius
+        self.max_size = max_size
+        self.regroup_every = regroup
+        self.tick = 0
+        self.of = []          # npc idx -> squad id (-1: not placed, dead at regroup)
+        self.members = []     # squad id -> list of NPCs
+
+        # alive members' sums at the start of the tick, per squad id
+        self.count = []
+        self.sx = []
+        self.sy = []
+        self.svx = []
+        self.svy = []
+        # the same as arrays, for BatchSteering
+        self.of_arr = np.zeros(0, dtype=np.intp)
+        self.count_arr = np.zeros(0)
+        self.sum_pos = np.zeros((0, 2))
+        self.sum_vel = np.zeros((0, 2))
+
+        # stats
+        self.regroups = 0
+
+    # ---------------------------------------
+    # GROUPING
+    # ---------------------------------------
+    def update(self):
+        # after World.perception (reuses its positions and alive flags)
+        npcs = self.world.npcs
+        if self.tick % self.regroup_every == 0 or len(self.of) != len(npcs):
+            self.regroup()
+        self.tick += 1
+        self._aggregate()
+
+    def regroup(self):
+        world = self.world
+        npcs = world.npcs
+        of = [-1] * len(npcs)
+        members = []
+        for n in npcs:
+            if not n.alive or of[n.idx] >= 0:
+                continue
+            s = len(members)
+            squad = [n]
+            of[n.idx] = s
+            for m in world.npcs_in_radius(n.pos, self.radius, exclude=n):
+                if len(squad) == self.max_size:
+                    break
+                if of[m.idx] < 0:
+                    of[m.idx] = s
+                    squad.append(m)
+            members.append(squad)
+        self.of = of
+        self.members = members
+        self.of_arr = np.array(of, dtype=np.intp)
+        self.regroups += 1
+
+    def load(self, tick, of):
+        # restore a saved grouping (snapshot.py)
+        npcs = self.world.npcs
+        self.tick = tick
+        self.of = list(of)
+        self.members = [[] for _ in range(max(self.of, default=-1) + 1)]
+        for n in npcs:
+            s = self.of[n.idx]
+            if s >= 0:
+                self.members[s].append(n)
+        self.of_arr = np.array(self.of, dtype=np.intp)
+
+    def _aggregate(self):
+        npcs = self.world.npcs
+        per = self.world.perception
+        n = len(npcs)
+        m = len(self.members)
+        of = self.of_arr
+        vel = np.fromiter(chain.from_iterable(npc.vel for npc in npcs), np.float64, 2 * n).reshape(n, 2)
+        live = np.asarray(per.alive, dtype=bool) & (of >= 0)
+        s = of[live]
+        pos = per.pos[live]
+        vel = vel[live]
+        self.count_arr = np.bincount(s, minlength=m).astype(np.float64)
+        self.sum_pos = np.stack((np.bincount(s, weights=pos[:, 0], minlength=m),
+                                 np.bincount(s, weights=pos[:, 1], minlength=m)), axis=1)
+        self.sum_vel = np.stack((np.bincount(s, weights=vel[:, 0], minlength=m),
+                                 np.bincount(s, weights=vel[:, 1], minlength=m)), axis=1)
+        self.count = self.count_arr.astype(np.intp).tolist()
+        self.sx = self.sum_pos[:, 0].tolist()
+        self.sy = self.sum_pos[:, 1].tolist()
+        self.svx = self.sum_vel[:, 0].tolist()
+        self.svy = self.sum_vel[:, 1].tolist()
+
+    # ---------------------------------------
+    # FLOCKING (per NPC, steering.py signatures)
+    # ---------------------------------------
+    # The sums hold each member's start-of-tick pos/vel, which are still its
+    # current ones when it steers (it moves after), so subtracting them
+    # leaves the other members only.
+    def cohesion(self, npc, out):
+        s = self.of[npc.idx]
+        k = self.count[s] - 1 if s >= 0 else 0
+        if k <= 0:
+            out[0] = out[1] = 0
+            return out
+        pos = npc.pos
+        return seek(pos, ((self.sx[s] - pos[0]) / k, (self.sy[s] - pos[1]) / k), COHESION_SPEED, out)
+
+    def alignment(self, npc, out):
+        s = self.of[npc.idx]
+        k = self.count[s] - 1 if s >= 0 else 0
+        if k <= 0:
+            out[0] = out[1] = 0
+            return out
+        vel = npc.vel
+        out[0] = (self.svx[s] - vel[0]) / k
+        out[1] = (self.svy[s] - vel[1]) / k
+        return out
+
+    # ---------------------------------------
+    # BROADCASTS
+    # ---------------------------------------
+    def squad_of(self, npc):
+        return self.of[npc.idx] if npc.idx < len(self.of) else -1
+
+    def notify(self, s, event):
+        # FSM event to every alive member (guards apply)
+        for n in self.members[s]:
+            if n.alive:
+                n.fsm.handle(event)
+
+    def broadcast(self, s, state):
+        # forced state change for every alive member
+        for n in self.members[s]:
+            if n.alive:
+                n.fsm.change(state)
@@ -1,40 +1,73 @@
-from utils import normalize, sub, mul
+import math
 
-def seek(pos, target, speed):
-    d = normalize(sub(target, pos))
-    return [d[0]*speed, d[1]*speed]
+# each behavior builds only its result list; with `out` it writes into
+# that list instead (no allocation at all)
 
-def flee(pos, target, speed):
-    d = normalize(sub(pos, target))
-    return [d[0]*speed, d[1]*speed]
+def seek(pos, target, speed, out=None):
+    dx = target[0]-pos[0]
+    dy = target[1]-pos[1]
+    mag = math.hypot(dx, dy)
+    if mag == 0:
+        x = y = 0*speed
+    else:
+        x = dx/mag*speed
+        y = dy/mag*speed
+    if out is None:
+        return [x, y]
+    out[0] = x
+    out[1] = y
+    return out
 
-def separation(npc, neighbors):
-    force = [0,0]
+def flee(pos, target, speed, out=None):
+    return seek(target, pos, speed, out)
+
+SEP_RADIUS = 50   # separation ignores neighbors farther than this
+
+def separation(npc, neighbors, out=None):
+    fx = fy = 0
+    px, py = npc.pos[0], npc.pos[1]
     for other in neighbors:
-        diff = sub(npc.pos, other.pos)
-        dist = (diff[0]**2 + diff[1]**2)**0.5
-        if dist < 50:
-            d = normalize(diff)
-            force[0] += d[0]*(60/dist)
-            force[1] += d[1]*(60/dist)
-    return force
-
-def cohesion(npc, neighbors):
+        dx = px - other.pos[0]
+        dy = py - other.pos[1]
+        dist = (dx**2 + dy**2)**0.5
+        # an NPC on the exact same spot has no direction to push away from
+        # (skipped, as in batch_steering)
+        if 0 < dist < SEP_RADIUS:
+            k = 60/dist
+            mag = math.hypot(dx, dy)
+            fx += dx/mag*k
+            fy += dy/mag*k
+    if out is None:
+        return [fx, fy]
+    out[0] = fx
+    out[1] = fy
+    return out
+
+def cohesion(npc, neighbors, out=None):
     if not neighbors:
-        return [0,0]
-    avg = [0,0]
+        return [0,0] if out is None else _zero(out)
+    ax = ay = 0
     for n in neighbors:
-        avg[0] += n.pos[0]
-        avg[1] += n.pos[1]
-    avg = [avg[0]/len(neighbors), avg[1]/len(neighbors)]
-    return seek(npc.pos, avg, 40)
+        ax += n.pos[0]
+        ay += n.pos[1]
+    k = len(neighbors)
+    return seek(npc.pos, (ax/k, ay/k), 40, out)
 
-def alignment(npc, neighbors):
+def alignment(npc, neighbors, out=None):
     if not neighbors:
-        return [0,0]
-    avg = [0,0]
+        return [0,0] if out is None else _zero(out)
+    ax = ay = 0
     for n in neighbors:
-        avg[0] += n.vel[0]
-        avg[1] += n.vel[1]
-    avg = [avg[0]/len(neighbors), avg[1]/len(neighbors)]
-    return avg
+        ax += n.vel[0]
+        ay += n.vel[1]
+    k = len(neighbors)
+    if out is None:
+        return [ax/k, ay/k]
+    out[0] = ax/k
+    out[1] = ay/k
+    return out
+
+def _zero(out):
+    out[0] = 0
+    out[1] = 0
+    return out
@@ -0,0 +1,71 @@
+# timestep.py
+# Fixed-step simulation clock for main.py: the world always advances in
+# steps of 1/SIM_HZ; rendering interpolates between the last two states.
+from config import SIM_HZ, MAX_SIM_STEPS, MAX_FRAME_DT
+
+
+class FixedTimestep:
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_SIM_STEPS, max_frame=MAX_FRAME_DT):
+        self.dt = 1.0 / hz
+        self.max_steps = max_steps
+        self.max_frame = max_frame
+        self.acc = 0.0
+        self.dropped = 0.0   # sim time thrown away by the catch-up cap
+
+    def advance(self, frame_dt):
+        # number of fixed steps to run for this frame
+        self.acc += min(frame_dt, self.max_frame)
+        steps = int(self.acc / self.dt)
+        if steps > self.max_steps:
+            # too far behind: run the cap and drop the rest of the backlog
+            self.dropped += self.acc - self.max_steps * self.dt
+            steps = self.max_steps
+            self.acc = self.max_steps * self.dt
+        self.acc -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        # how far the render time is between the previous and current state
+        return min(1.0, self.acc / self.dt)
+
+    def reset(self):
+        self.acc = 0.0
+
+
+class Interpolation:
+    # positions from before the last fixed step of the frame
+    def __init__(self):
+        self.alpha = 1.0
+        self.dt = 0.0
+        self.npc_prev = []
+        self.player_prev = None
+
+    def capture(self, world, player):
+        self.npc_prev = [(n.pos[0], n.pos[1]) for n in world.npcs]
+        self.player_prev = (player.pos[0], player.pos[1])
+
+    def clear(self):
+        self.npc_prev = []
+        self.player_prev = None
+
+    def lerp(self, prev, cur):
+        a = self.alpha
+        return prev[0] + (cur[0] - prev[0]) * a, prev[1] + (cur[1] - prev[1]) * a
+
+    def npc_pos(self, n):
+        if 0 <= n.idx < len(self.npc_prev):
+            return self.lerp(self.npc_prev[n.idx], n.pos)
+        return n.pos[0], n.pos[1]
+
+    def player_pos(self, player):
+        if self.player_prev is None:
+            return player.pos[0], player.pos[1]
+        return self.lerp(self.player_prev, player.pos)
+
+    def projectile_positions(self, store):
+        # bullets move in straight lines: step back along the velocity
+        pos = store.positions()
+        if self.alpha >= 1.0 or not len(pos):
+            return pos
+        return pos - store.vel[:store.n] * ((1.0 - self.alpha) * self.dt)
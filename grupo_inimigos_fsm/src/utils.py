@@ -17,3 +17,10 @@ def sub(a, b):
 
 def mul(a, s):
     return [a[0]*s, a[1]*s]
+
+# in-place: write x, y into `out` (a 2-list) and return it, so hot paths
+# reuse one list instead of allocating per call
+def set2(out, x, y):
+    out[0] = x
+    out[1] = y
+    return out
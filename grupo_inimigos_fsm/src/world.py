@@ -1,66 +1,132 @@
 # world.py
 import pygame
 import random
+import numpy as np
 from utils import distance
-from projectile import Projectile
-from config import MAP_W, MAP_H, VIEW_W, VIEW_H
+from projectile import ProjectileStore
+from spatial import SpatialHash
+from batch_steering import BatchSteering
+from flowfield import FlowField
+from pathfinding import PathFinder
+from hpa import HierarchicalPathFinder
+from occupancy import Occupancy
+from lod import LodScheduler
+from pathqueue import PathQueue
+from pathservice import PathService
+from events import EventBus
+from perception import Perception
+from squads import SquadManager
+from mapdata import load_map, rasterize
+from los import LineOfSight
+from profiler import Profiler
+from config import MAP_FILE, VIEW_W, VIEW_H, NEIGHBOR_CELL, BATCH_STEERING, FLOW_FIELD, LOD_ENABLED, PATH_QUEUE, PATH_ASYNC, PATH_WORKERS, HPA_MIN_CELLS, SQUADS
 
 # NPC classes imported dynamically to avoid circular import issues
 from npc import Brute, Shooter, Support
-from fsm import Retreat, Engage, Patrol
+from fsm import RETREAT, ENGAGE, PATROL
 
 class World:
-    def __init__(self, view_w, view_h):
-        self.map_w = MAP_W
-        self.map_h = MAP_H
+    def __init__(self, view_w, view_h, path_workers=PATH_WORKERS, map_file=MAP_FILE):
+        # baked map (mapdata.py), loaded once per process and shared
+        nav = load_map(map_file)
+        self.map_w = nav.width
+        self.map_h = nav.height
         self.view_w = view_w
         self.view_h = view_h
 
-        self.tile = 32
-        self.grid_w = self.map_w // self.tile
-        self.grid_h = self.map_h // self.tile
+        self.tile = nav.tile
+        self.grid_w = nav.grid_w
+        self.grid_h = nav.grid_h
 
         self.npcs = []
-        self.projectiles = []
+        self.events = EventBus(self)
+        self.perception = Perception()   # NPC -> player table, rebuilt every tick
+        self.squads = SquadManager(self) if SQUADS else None   # None = neighbor flocking
+        self.projectiles = ProjectileStore()
         self.obstacles = []
         self.hearts = []
 
+        # spatial hash of NPC indices for radius queries
+        self.npc_hash = SpatialHash(NEIGHBOR_CELL)
+
+        # vectorized steering for engaged NPCs (None = per-object steering.py)
+        self.batch_steering = BatchSteering() if BATCH_STEERING else None
+
+        # profiling (main.py swaps in its own, shared across resets)
+        self.prof = Profiler()
+        self.radius_queries = 0
+        self.projectile_checks = 0
+        self.npc_updates = 0
+
+        # reduced AI rate for NPCs far from the player (None = all every tick)
+        self.lod = LodScheduler() if LOD_ENABLED else None
+
         # parameters for EMP (accessible via player/world)
         self.emp_radius = 140
         self.emp_damage = 20
         self.emp_knockback = 220
 
-        # define obstacles
-        self.obstacles = [
-            pygame.Rect(300, 120, 160, 120),
-            pygame.Rect(120, 380, 220, 100),
-            pygame.Rect(680, 260, 180, 160),
-            pygame.Rect(480, 480, 220, 100)
-        ]
+        # obstacles, grid and occupancy come prebuilt with the map; the
+        # occupancy tables are read-only and shared
+        self.obstacles = [pygame.Rect(r) for r in nav.rects]
+        self.occupancy = nav.occupancy
+        self.grid = [col[:] for col in nav.grid]
+        self.blocked = nav.blocked_bytes   # flat x*grid_h + y copy of grid
+        self.free_cells = nav.free         # flat indices of free tiles
+        self.grid_version = 1
+        # navigation tables baked for this grid (None once it changes)
+        self.baked = nav
+        self.pathfinder = PathFinder(self)
 
-        # build grid
-        self.grid = [[0 for _ in range(self.grid_h)] for _ in range(self.grid_w)]
-        self._build_grid()
+        # grid line of sight (detection, shooting)
+        self.los = LineOfSight(self)
+
+        # large maps: hierarchical search instead of full-grid A*
+        self.hpa = HierarchicalPathFinder(self) if self.grid_w * self.grid_h >= HPA_MIN_CELLS else None
+
+        # shared path field toward the player (None = per-NPC path requests).
+        # A full-grid BFS per player tile change; on HPA-sized maps NPCs
+        # plan through find_path (hpa) instead
+        self.flow = FlowField(self) if FLOW_FIELD and self.hpa is None else None
+
+        # budgeted, prioritized A* replans (None = each NPC searches inline)
+        self.path_queue = PathQueue(self) if PATH_QUEUE else None
+
+        # A* off the main thread (None = path_queue / inline); 0 workers
+        # solves synchronously
+        self.path_service = PathService(self, path_workers) if PATH_ASYNC else None
 
         # spawn hearts
         self.spawn_hearts(5)
 
     def _build_grid(self):
-        for x in range(self.grid_w):
-            for y in range(self.grid_h):
-                cx = x * self.tile + self.tile / 2
-                cy = y * self.tile + self.tile / 2
-                for r in self.obstacles:
-                    if r.collidepoint(cx, cy):
-                        self.grid[x][y] = 1
-                        break
+        blocked = rasterize(self.obstacles, self.grid_w, self.grid_h, self.tile)
+        self.grid = blocked.tolist()
+        self.blocked = blocked.tobytes()
+        self.free_cells = np.flatnonzero(blocked.ravel() == 0).astype(np.int32)
+        self.grid_version += 1
+        self.baked = None
+
+    def set_obstacles(self, rects):
+        # new layout: rebuild the grid and drop everything derived from it
+        self.obstacles = list(rects)
+        self.occupancy = Occupancy(self.obstacles)
+        self._build_grid()
+        if self.flow is not None:
+            self.flow.invalidate()
+
+    def close(self):
+        # stop background workers (path service pool)
+        if self.path_service is not None:
+            self.path_service.close()
+
+    def camera_center(self, pos):
+        # view centered on pos, clamped to the map (main.py camera)
+        return (max(self.view_w // 2, min(pos[0], self.map_w - self.view_w // 2)),
+                max(self.view_h // 2, min(pos[1], self.map_h - self.view_h // 2)))
 
     def point_in_obstacle(self, pt):
-        x, y = pt
-        for r in self.obstacles:
-            if r.collidepoint(x, y):
-                return True
-        return False
+        return self.occupancy.contains(pt)
 
     def add_player(self, player):
         self.player = player
@@ -87,47 +153,157 @@ class World:
                 y = random.randint(60, self.map_h - 60)
                 if not self.point_in_obstacle((x, y)):
                     typ = random.choice([Brute, Shooter, Support])
-                    self.npcs.append(typ(self, x, y))
+                    self.add_npc(typ(self, x, y))
                     placed = True
             if not placed:
                 # fallback
-                self.npcs.append(Shooter(self, 100 + i*20, 100))
+                self.add_npc(Shooter(self, 100 + i*20, 100))
 
-    def broadcast_engage(self):
+    # npc.idx (the NPC's row in perception, squads, LOS, batch steering) is
+    # only ever assigned here and in set_npcs
+    def add_npc(self, npc):
+        if npc.idx >= 0:
+            raise ValueError("NPC already belongs to a world")
+        npc.idx = len(self.npcs)
+        self.npc_hash.insert(npc.idx, npc.pos)
+        self.npcs.append(npc)
+
+    def set_npcs(self, npcs):
+        # replace the whole list (snapshot.restore): renumber and re-index
+        for i, n in enumerate(npcs):
+            n.idx = i
+        self.npcs = npcs
+        self.npc_hash.rebuild((i, n.pos) for i, n in enumerate(npcs))
+
+    def npcs_in_radius(self, pos, radius, exclude=None):
+        # same result and order as scanning self.npcs with distance() < radius
+        self.radius_queries += 1
+        ids = self.npc_hash.candidates(pos, radius)
+        ids.sort()
+        npcs = self.npcs
+        out = []
+        for i in ids:
+            n = npcs[i]
+            if n is not exclude and n.alive and distance(pos, n.pos) < radius:
+                out.append(n)
+        return out
+
+    def broadcast_engage(self, squad=None):
+        # one squad (World.squads id) or everyone
+        if squad is not None:
+            self.squads.broadcast(squad, ENGAGE)
+            return
         for n in self.npcs:
             if n.alive:
-                n.fsm.change(Engage())
+                n.fsm.change(ENGAGE)
 
-    def broadcast_retreat(self):
+    def broadcast_retreat(self, squad=None):
+        if squad is not None:
+            self.squads.broadcast(squad, RETREAT)
+            return
         for n in self.npcs:
             if n.alive:
-                n.fsm.change(Retreat())
+                n.fsm.change(RETREAT)
 
     def spawn_projectile(self, pos, vel, dmg=10, owner=None):
-        self.projectiles.append(Projectile(pos[:], vel[:], dmg, owner))
+        self.projectiles.spawn(pos, vel, dmg, owner)
 
     def update(self, dt):
-        # update NPCs
-        for n in self.npcs:
-            n.update(dt)
+        prof = self.prof
+        if not prof.enabled:
+            self.perception.update(self)
+            if self.squads is not None:
+                self.squads.update()
+            self.update_npcs(dt)
+            self.update_projectiles(dt)
+            self.update_hearts()
+            self.update_events()
+            return
+
+        prof.start("perception")
+        self.perception.update(self)
+        prof.stop("perception")
+        if self.squads is not None:
+            prof.start("squads")
+            self.squads.update()
+            prof.stop("squads")
+        prof.start("npcs")
+        self.update_npcs(dt)
+        prof.stop("npcs")
+        prof.start("projectiles")
+        self.update_projectiles(dt)
+        prof.stop("projectiles")
+        prof.start("hearts")
+        self.update_hearts()
+        prof.stop("hearts")
+        prof.start("events")
+        self.update_events()
+        prof.stop("events")
+
+    def update_npcs(self, dt):
+        # rebuilt only when the player changes tile
+        if self.flow is not None:
+            goal = (int(self.player.pos[0] // self.tile), int(self.player.pos[1] // self.tile))
+            if self.prof.enabled:
+                self.prof.start("flow")
+                self.flow.set_goal(goal)
+                self.prof.stop("flow")
+            else:
+                self.flow.set_goal(goal)
 
-        # update projectiles (iterate copy)
-        for p in list(self.projectiles):
-            alive = p.update(dt, self)
-            if not alive:
-                try:
-                    self.projectiles.remove(p)
-                except ValueError:
-                    pass
+        # update NPCs (keep the hash in sync as each one moves)
+        if self.lod is not None:
+            self.lod.update(self, dt)
+        else:
+            for i, n in enumerate(self.npcs):
+                n.update(dt)
+                self.npc_hash.move(i, n.pos)
+            self.npc_updates += len(self.npcs)
+        if self.batch_steering is not None:
+            self.batch_steering.flush(self)
 
+        if self.path_queue is not None:
+            if self.prof.enabled:
+                self.prof.add("path_queue", len(self.path_queue))
+                self.prof.start("astar")
+                self.path_queue.process()
+                self.prof.stop("astar")
+            else:
+                self.path_queue.process()
+
+    def update_projectiles(self, dt):
+        # one batched move/collide/compact pass over every projectile
+        self.projectile_checks += self.projectiles.update(dt, self)
+
+    def update_events(self):
+        # FSM transitions for this tick, after everything has moved and hit
+        self.events.detect_player()
+        self.events.dispatch()
+
+    def update_hearts(self):
         # heart pickup
         for h in list(self.hearts):
             if distance(self.player.pos, h) < 26:
                 self.player.hp = min(self.player.max_hp, self.player.hp + 40)
                 self.hearts.remove(h)
 
-    # A* implementation
     def astar(self, start, goal):
+        return self.pathfinder.find(start, goal)
+
+    def find_path(self, start, goal):
+        # NPC path requests: may return a partial path on large maps
+        if self.hpa is not None:
+            return self.hpa.find(start, goal)
+        return self.pathfinder.find(start, goal)
+
+    def path_nodes(self):
+        # nodes expanded by all path searches so far
+        if self.hpa is not None:
+            return self.pathfinder.expanded + self.hpa.expanded
+        return self.pathfinder.expanded
+
+    # original A* implementation, kept as reference for benchmarks
+    def astar_reference(self, start, goal):
         sx, sy = start
         gx, gy = goal
         if not (0 <= gx < self.grid_w and 0 <= gy < self.grid_h):
@@ -172,13 +348,13 @@ class World:
         return None
 
     def retreat_state(self):
-        return Retreat()
+        return RETREAT
 
     def engage_state(self):
-        return Engage()
+        return ENGAGE
 
     def patrol_state(self):
-        return Patrol()
+        return PATROL
 
     def on_player_death(self):
         print("PLAYER MORREU!")
@@ -0,0 +1,38 @@
+# conftest.py
+# the game modules are flat scripts in src/: import them the same way
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from world import World
+from player import Player
+from npc import Brute, Shooter, Support
+from config import VIEW_W, VIEW_H
+
+
+@pytest.fixture
+def world():
+    # default map, player in the middle, no NPCs
+    random.seed(1)
+    w = World(VIEW_W, VIEW_H, path_workers=0)
+    w.add_player(Player(w))
+    return w
+
+
+@pytest.fixture
+def swarm(world):
+    # 150 NPCs packed around the player with random velocities, 10 dead
+    rng = random.Random(3)
+    for _ in range(150):
+        typ = rng.choice([Brute, Shooter, Support])
+        npc = typ(world, rng.uniform(340, 940), rng.uniform(120, 600))
+        npc.vel[0] = rng.uniform(-150, 150)
+        npc.vel[1] = rng.uniform(-150, 150)
+        world.add_npc(npc)
+    for npc in rng.sample(world.npcs, 10):
+        npc.alive = False
+    return world
@@ -0,0 +1,116 @@
+# test_events.py
+# FSM transitions happen only when World.events dispatches: spotting the
+# player, HEALTH from hits (Projectile and ProjectileStore) and heals, and the
+# HEALTH re-check FSM.change queues on entering a state.
+import pytest
+
+from npc import Brute
+from projectile import Projectile
+from fsm import PATROL, ENGAGE, RETREAT, PLAYER_IN_RANGE, HEALTH, ALLY_DIED
+
+
+@pytest.fixture
+def npc(world):
+    # in clear sight of the player
+    px, py = world.player.pos
+    n = Brute(world, px - 300, py)
+    world.add_npc(n)
+    world.perception.update(world)
+    world.events.queue = []
+    return n
+
+
+def engage(world, n):
+    n.fsm.change(ENGAGE)
+    world.events.dispatch()    # HEALTH from the change: health is fine, stays
+    assert n.fsm.current is ENGAGE and not world.events.queue
+
+
+def test_spotting_engages(world, npc):
+    world.update_events()
+    assert npc.fsm.current is ENGAGE
+
+
+def test_state_changes_wait_for_dispatch(world, npc):
+    world.events.emit(PLAYER_IN_RANGE, npc)
+    assert npc.fsm.current is PATROL
+    world.events.dispatch()
+    assert npc.fsm.current is ENGAGE
+
+
+def test_projectile_hit_emits_health(world, npc):
+    engage(world, npc)
+    npc.health = 35
+    shot = Projectile(npc.pos, [0.0, 0.0], 10, world.player)
+    assert not shot.update(0.0, world)
+    assert world.events.queue == [(HEALTH, npc)]
+    assert npc.fsm.current is ENGAGE
+    world.events.dispatch()
+    assert npc.fsm.current is RETREAT
+
+
+def test_batched_hit_emits_health(world, npc):
+    engage(world, npc)
+    npc.health = 35
+    world.projectiles.spawn(npc.pos, (0.0, 0.0), 10, world.player)
+    world.update_projectiles(0.0)
+    assert world.events.queue == [(HEALTH, npc)]
+    world.events.dispatch()
+    assert npc.fsm.current is RETREAT
+
+
+def test_light_hit_keeps_engaging(world, npc):
+    engage(world, npc)
+    world.projectiles.spawn(npc.pos, (0.0, 0.0), 10, world.player)
+    world.update_projectiles(0.0)
+    world.events.dispatch()
+    assert npc.health == 210
+    assert npc.fsm.current is ENGAGE
+
+
+def test_change_rechecks_health(world, npc):
+    # already hurt when it spots the player: engages, then the HEALTH the
+    # change queued makes it retreat on the next dispatch
+    npc.health = 20
+    world.events.emit(PLAYER_IN_RANGE, npc)
+    world.events.dispatch()
+    assert npc.fsm.current is ENGAGE
+    assert world.events.queue == [(HEALTH, npc)]
+    world.events.dispatch()
+    assert npc.fsm.current is RETREAT
+
+
+def test_ally_death_retreats_then_recovers(world, npc):
+    # a squadmate dies at full health: retreat, then the HEALTH the change
+    # queued sends it back to patrol
+    px, py = world.player.pos
+    ally = Brute(world, px - 330, py)
+    world.add_npc(ally)
+    world.perception.update(world)
+    world.squads.update()
+    ally.health = 0
+    ally.update(0.0)
+    assert world.events.queue == [(ALLY_DIED, ally)]
+    world.events.dispatch()
+    assert npc.fsm.current is RETREAT
+    assert world.events.queue == [(HEALTH, npc)]
+    world.events.dispatch()
+    assert npc.fsm.current is PATROL
+
+
+def test_healed_retreat_returns_to_patrol(world, npc):
+    npc.health = 20
+    npc.fsm.change(RETREAT)
+    world.events.dispatch()
+    assert npc.fsm.current is RETREAT
+    npc.health = 80
+    world.events.emit(HEALTH, npc)
+    world.events.dispatch()
+    assert npc.fsm.current is PATROL
+
+
+def test_dead_npcs_ignore_events(world, npc):
+    npc.alive = False
+    world.events.emit(PLAYER_IN_RANGE, npc)
+    world.events.dispatch()
+    assert npc.fsm.current is PATROL
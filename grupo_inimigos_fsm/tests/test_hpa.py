@@ -0,0 +1,61 @@
+# test_hpa.py
+# HPA* against flat A* on procedural maps: same reachability, valid paths,
+# length within a bound, and partial paths that are prefixes of full ones.
+import json
+import random
+
+import pytest
+
+import mapdata
+from world import World
+from pathfinding import PathFinder
+from hpa import HierarchicalPathFinder
+from config import VIEW_W, VIEW_H, HPA_CLUSTER
+
+
+@pytest.fixture(params=[(1, 40), (2, 12), (3, 6)], ids=["open", "mixed", "dense"])
+def grid_world(request, tmp_path):
+    seed, density = request.param
+    path = tmp_path / "map.json"
+    path.write_text(json.dumps(mapdata.procedural(3200, 1920, seed, density=density)))
+    return World(VIEW_W, VIEW_H, path_workers=0, map_file=str(path))
+
+
+def queries(world, count=300):
+    # long random pairs and short ones (same or neighboring clusters),
+    # starts on blocked tiles included
+    rng = random.Random(7)
+    w, h = world.grid_w, world.grid_h
+    free = [divmod(i, h) for i in world.free_cells.tolist()]
+    out = []
+    for k in range(count):
+        s = rng.choice(free) if k % 5 else (rng.randrange(w), rng.randrange(h))
+        if k % 2:
+            g = rng.choice(free)
+        else:
+            g = (min(w - 1, max(0, s[0] + rng.randint(-20, 20))), min(h - 1, max(0, s[1] + rng.randint(-20, 20))))
+        out.append((s, g))
+    return out
+
+
+def test_matches_flat_astar(grid_world):
+    world = grid_world
+    flat = PathFinder(world)
+    hpa = HierarchicalPathFinder(world)
+    found = 0
+    for s, g in queries(world):
+        best = flat.find(s, g)
+        path = hpa.find(s, g, legs=1 << 30)
+        assert (path is None) == (best is None), (s, g)
+        if best is None:
+            continue
+        found += 1
+        assert path[0] == s and path[-1] == g
+        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+        assert not any(world.grid[x][y] for x, y in path[1:])
+        # entrance detours: a quarter of the optimal length plus a cluster
+        assert len(path) - len(best) <= len(best) // 4 + HPA_CLUSTER, (s, g)
+        # what NPCs get: the first crossings of that same path
+        partial = hpa.find(s, g)
+        assert partial == path[:len(partial)]
+    assert found > 20
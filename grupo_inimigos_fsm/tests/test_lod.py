@@ -0,0 +1,74 @@
+# test_lod.py
+# LOD-skipped NPCs integrate the dt they were skipped for, on the per-object
+# and the batched (BATCH_STEERING) path alike.
+import json
+import random
+
+import pytest
+
+import mapdata
+from world import World
+from player import Player
+from npc import Brute
+from lod import LodScheduler
+from batch_steering import BatchSteering
+from fsm import ENGAGE
+from utils import distance
+from config import VIEW_W, VIEW_H
+
+DT = 1 / 60
+
+
+@pytest.fixture
+def open_map(tmp_path):
+    # 3200x1800 px, no obstacles
+    path = tmp_path / "open.json"
+    path.write_text(json.dumps(mapdata.procedural(3200, 1800, density=10 ** 9)))
+    return str(path)
+
+
+def brute_travel(map_file, batch, lod, ticks=60):
+    random.seed(1)
+    world = World(VIEW_W, VIEW_H, path_workers=0, map_file=map_file)
+    world.add_player(Player(world))
+    world.batch_steering = BatchSteering() if batch else None
+    world.lod = LodScheduler() if lod else None
+    # engaged, 1400 px from the player (beyond LOD_FAR)
+    brute = Brute(world, world.player.pos[0] + 1400, world.player.pos[1])
+    world.add_npc(brute)
+    brute.fsm.change(ENGAGE)
+    start = brute.pos[:]
+    for _ in range(ticks):
+        world.update(DT)
+    return distance(start, brute.pos)
+
+
+@pytest.mark.parametrize("lod", [False, True])
+def test_batched_matches_per_object(open_map, lod):
+    per_object = brute_travel(open_map, batch=False, lod=lod)
+    batched = brute_travel(open_map, batch=True, lod=lod)
+    assert per_object > 50
+    assert batched == pytest.approx(per_object, rel=1e-6)
+
+
+def test_lod_keeps_speed(open_map):
+    full = brute_travel(open_map, batch=True, lod=False)
+    reduced = brute_travel(open_map, batch=True, lod=True)
+    # at most one LOD period (4 ticks out here) not integrated yet
+    assert abs(reduced - full) < 110 * 4 * DT
+
+
+def test_on_screen_npcs_run_every_tick(world):
+    # player in the top-left corner: the camera is clamped to (480, 270), so
+    # NPCs on screen can be ~1000 px from the player
+    world.player.pos[0] = world.player.pos[1] = 60.0
+    lod = LodScheduler()
+    lod.set_view(world)
+    on_screen = [(920, 500), (959, 539), (1000, 560), (0, 539)]
+    off_screen = [(1250, 700), (1200, 100)]
+    for x, y in on_screen + off_screen:
+        world.add_npc(Brute(world, x, y))
+    for npc in world.npcs:
+        d2 = distance(npc.pos, world.player.pos) ** 2
+        expected = 1 if tuple(npc.pos) in on_screen else 8
+        assert lod.period(npc, d2) == expected
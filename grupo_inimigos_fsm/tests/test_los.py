@@ -0,0 +1,109 @@
+# test_los.py
+# The DDA in LineOfSight against a sampled reference: walk the segment
+# between the two tile centers in steps short enough to land in every tile
+# it crosses, and count a tile corner it passes through as touching all
+# four tiles around it. The end tiles never block.
+import json
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import mapdata
+from world import World
+from los import LineOfSight
+from config import VIEW_W, VIEW_H
+
+
+@pytest.fixture(params=[(1, 40), (2, 12), (3, 6)], ids=["open", "mixed", "dense"])
+def grid_world(request, tmp_path):
+    seed, density = request.param
+    path = tmp_path / "map.json"
+    path.write_text(json.dumps(mapdata.procedural(1600, 960, seed, density=density)))
+    return World(VIEW_W, VIEW_H, path_workers=0, map_file=str(path))
+
+
+def touched(a, b):
+    # tiles the closed segment between tile centers a and b touches
+    (x0, y0), (x1, y1) = a, b
+    dx, dy = x1 - x0, y1 - y0
+    d = abs(dx) + abs(dy)
+    # a crossed tile holds at least 1/d of the segment; sample 4x finer
+    t = np.linspace(0.0, 1.0, 4 * d * d + 2)
+    xs = np.floor(x0 + 0.5 + t * dx).astype(int)
+    ys = np.floor(y0 + 0.5 + t * dy).astype(int)
+    tiles = set(zip(xs.tolist(), ys.tolist()))
+    # corners: x and y both integer at the same t
+    if dx:
+        for X in range(min(x0, x1) + 1, max(x0, x1) + 1):
+            t = Fraction(2 * (X - x0) - 1, 2 * dx)
+            y = y0 + Fraction(1, 2) + t * dy
+            if y.denominator == 1:
+                Y = int(y)
+                tiles.update(((X - 1, Y - 1), (X - 1, Y), (X, Y - 1), (X, Y)))
+    return tiles
+
+
+def reference(world, a, b):
+    return not any(world.grid[x][y] for x, y in touched(a, b) - {a, b})
+
+
+def pairs(world, count=1500, reach=24):
+    rng = random.Random(11)
+    w, h = world.grid_w, world.grid_h
+    out = []
+    for k in range(count):
+        a = (rng.randrange(w), rng.randrange(h))
+        if k % 4 == 0:
+            # exact diagonals, which run through tile corners
+            s = rng.randint(-reach, reach)
+            b = (a[0] + s, a[1] + rng.choice((s, -s)))
+        else:
+            b = (a[0] + rng.randint(-reach, reach), a[1] + rng.randint(-reach, reach))
+        b = (min(w - 1, max(0, b[0])), min(h - 1, max(0, b[1])))
+        out.append((a, b))
+    return out
+
+
+def test_dda_matches_sampled_reference(grid_world):
+    world = grid_world
+    los = LineOfSight(world)
+    los._sync()
+    h = world.grid_h
+    seen = blocked = 0
+    for a, b in pairs(world):
+        ia, ib = a[0] * h + a[1], b[0] * h + b[1]
+        want = reference(world, a, b)
+        assert los._trace(ia, ib) == want, (a, b)
+        assert los._trace(ib, ia) == want, (b, a)
+        seen += want
+        blocked += not want
+    assert seen > 50 and blocked > 50
+
+
+def test_visible_uses_tile_centers(grid_world):
+    world = grid_world
+    los = LineOfSight(world)
+    tile = world.tile
+    for a, b in pairs(world, count=300):
+        pa = (a[0] * tile + 3, a[1] * tile + tile - 3)
+        pb = (b[0] * tile + tile - 1, b[1] * tile)
+        assert los.visible(pa, pb) == reference(world, a, b), (a, b)
+
+
+def test_corner_blocks_if_either_side_does(world):
+    # free diagonal from (x, y) to (x+2, y+2) with one tile beside the
+    # corner it passes through blocked
+    los = LineOfSight(world)
+    los._sync()
+    h = world.grid_h
+    x, y = next((x, y) for x in range(world.grid_w - 2) for y in range(h - 2)
+                if not any(world.grid[x + i][y + j] for i in range(3) for j in range(3)))
+    a, b = x * h + y, (x + 2) * h + y + 2
+    assert los._trace(a, b)
+    for side in ((x + 2) * h + y + 1, (x + 1) * h + y + 2):
+        los.blocked = bytearray(world.blocked)
+        los.blocked[side] = 1
+        assert not los._trace(a, b)
+        assert not los._trace(b, a)
@@ -0,0 +1,30 @@
+# test_npc.py
+# npc.idx comes only from World.add_npc / World.set_npcs: an NPC outside the
+# world can't read someone else's perception row.
+import pytest
+
+from npc import Brute, Shooter
+
+
+def test_unadded_npc_refuses_perception(world):
+    world.add_npc(Brute(world, 300, 300))
+    world.perception.update(world)
+    stray = Shooter(world, 320, 300)
+    with pytest.raises(RuntimeError, match="add_npc"):
+        stray.can_see_player()
+    with pytest.raises(RuntimeError, match="add_npc"):
+        stray.behavior_engage(0.1)
+    with pytest.raises(RuntimeError, match="add_npc"):
+        stray.behavior_retreat(0.1)
+
+
+def test_add_npc_numbers_once(world):
+    a, b = Brute(world, 300, 300), Brute(world, 340, 300)
+    world.add_npc(a)
+    world.add_npc(b)
+    assert (a.idx, b.idx) == (0, 1)
+    with pytest.raises(ValueError):
+        world.add_npc(a)
+    world.set_npcs([b, a])
+    assert (b.idx, a.idx) == (0, 1)
+    assert world.npcs_in_radius(b.pos, 10) == [b]
@@ -0,0 +1,53 @@
+# test_occupancy.py
+# Occupancy.contains / contains_many against pygame.Rect.collidepoint over
+# every rect, on rect edges and fractional or negative points.
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from occupancy import Occupancy
+
+
+def rect_sets():
+    rng = random.Random(9)
+    default = [pygame.Rect(r) for r in [(300, 120, 160, 120), (120, 380, 220, 100),
+                                         (680, 260, 180, 160), (480, 480, 220, 100)]]
+    # odd sizes and offsets, overlaps, negative and empty rects; > 32 rects
+    # takes the per-point path in contains_many
+    many = [pygame.Rect(rng.randint(-50, 600), rng.randint(-50, 400), rng.randint(0, 90), rng.randint(0, 90))
+            for _ in range(60)]
+    return {"default": default, "many": many}
+
+
+def probe_points(rects):
+    rng = random.Random(11)
+    pts = []
+    for r in rects:
+        for x in (r.left, r.right - 1, r.right, r.centerx):
+            for y in (r.top, r.bottom - 1, r.bottom, r.centery):
+                for dx, dy in ((0, 0), (0.5, 0.5), (-0.5, -0.5), (-1e-9, 0), (0, 0.999)):
+                    pts.append((x + dx, y + dy))
+    pts += [(rng.uniform(-80, 1000), rng.uniform(-80, 700)) for _ in range(2000)]
+    pts += [(-0.5, -0.5), (-1, 0), (0, -1), (-0.0, 0.0)]
+    return pts
+
+
+def occupancies(rects):
+    # built from the rects, and loaded from its tables like a baked map
+    occ = Occupancy(rects)
+    tables = [np.array(a, dtype=np.int32) for a in occ.mixed_tables()]
+    baked = Occupancy.from_tables(rects, (occ.x0, occ.y0, occ.x1, occ.y1, occ.cw, occ.ch),
+                                  occ.grid, *tables)
+    return [occ, baked]
+
+
+@pytest.mark.parametrize("name", ["default", "many"])
+def test_contains_matches_collidepoint(name):
+    rects = rect_sets()[name]
+    pts = probe_points(rects)
+    want = [any(r.collidepoint(p) for r in rects) for p in pts]
+    for occ in occupancies(rects):
+        assert [occ.contains(p) for p in pts] == want
+        assert occ.contains_many(np.array(pts)).tolist() == want
@@ -0,0 +1,78 @@
+# test_replay.py
+# A recorded session played back from its file ends in the recorded state.
+import pytest
+
+import replay
+from headless import HeadlessRunner, BotInput
+
+SEED = 7
+NPCS = 30
+TICKS = 300
+
+
+class RecordingInput:
+    # BotInput, with every frame also written to a Recorder; the mouse goes
+    # through an int16 like a real screen position
+    def __init__(self, recorder):
+        self.bot = BotInput()
+        self.recorder = recorder
+
+    def poll(self, tick, world, player):
+        keys, mouse, fire = self.bot.poll(tick, world, player)
+        mouse = (int(mouse[0]), int(mouse[1]))
+        self.recorder.add(keys, mouse, world.view_w // 2, world.view_h // 2, fire)
+        return keys, mouse, fire
+
+
+@pytest.fixture
+def recording(tmp_path):
+    runner = HeadlessRunner(SEED, NPCS)
+    recorder = replay.Recorder(SEED, NPCS, runner.dt)
+    runner.inputs = RecordingInput(recorder)
+    assert runner.run(TICKS, stop_on_death=False) == TICKS
+    path = tmp_path / "session.rpl"
+    recorder.save(path, runner.world, runner.player)
+    return path, replay.state_digest(runner.world, runner.player)
+
+
+def test_replay_matches_recording(recording):
+    path, digest = recording
+    rp = replay.Replay.load(path)
+    assert rp.ticks == TICKS and rp.digest == digest
+    assert rp.config_mismatch() == []
+
+    runner, ticks = replay.play(rp)
+    assert ticks == TICKS
+    assert replay.state_digest(runner.world, runner.player) == digest
+
+
+def test_replay_is_repeatable(recording):
+    path, _ = recording
+    rp = replay.Replay.load(path)
+    digests = []
+    replay.play(rp, on_tick=lambda r: digests.append(replay.state_digest(r.world, r.player)))
+    again = []
+    replay.play(rp, on_tick=lambda r: again.append(replay.state_digest(r.world, r.player)))
+    assert digests == again
+
+
+def test_changed_input_diverges(recording):
+    path, digest = recording
+    rp = replay.Replay.load(path)
+    # hold fire off for the whole session
+    body = bytearray(rp.body)
+    for t in range(rp.ticks):
+        bits, mx, my, camx, camy = rp.frame(t)
+        replay.TICK.pack_into(body, t * replay.TICK.size, bits & ~replay.FIRE_BIT, mx, my, camx, camy)
+    rp.body = bytes(body)
+    runner, _ = replay.play(rp)
+    assert replay.state_digest(runner.world, runner.player) != digest
+
+
+def test_load_rejects_bad_files(recording, tmp_path):
+    path, _ = recording
+    data = path.read_bytes()
+    bad = tmp_path / "bad.rpl"
+    bad.write_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError, match="not a replay"):
+        replay.Replay.load(bad)
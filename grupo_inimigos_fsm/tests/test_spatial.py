@@ -0,0 +1,29 @@
+# test_spatial.py
+# World.npcs_in_radius (spatial hash) against the brute-force scan it
+# replaced: same NPCs, same order.
+import random
+
+import pytest
+
+from utils import distance
+
+
+def scan(world, pos, radius, exclude=None):
+    return [n for n in world.npcs if n is not exclude and n.alive and distance(pos, n.pos) < radius]
+
+
+@pytest.mark.parametrize("radius", [10, 50, 90, 140, 300])
+def test_npcs_in_radius_matches_scan(swarm, radius):
+    world = swarm
+    rng = random.Random(radius)
+    for _ in range(3):
+        for npc in world.npcs:
+            assert world.npcs_in_radius(npc.pos, radius, exclude=npc) == scan(world, npc.pos, radius, npc)
+        for _ in range(50):
+            pos = (rng.uniform(-200, 1480), rng.uniform(-200, 920))
+            assert world.npcs_in_radius(pos, radius) == scan(world, pos, radius)
+        # move some NPCs (across cells, off the map) and keep the hash in sync
+        for npc in rng.sample(world.npcs, 40):
+            npc.pos[0] += rng.uniform(-400, 400)
+            npc.pos[1] += rng.uniform(-400, 400)
+            world.npc_hash.move(npc.idx, npc.pos)
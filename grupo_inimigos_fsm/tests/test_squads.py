@@ -0,0 +1,50 @@
+# test_squads.py
+# Squad broadcasts: an ally's death makes its squad retreat; spotting the
+# player alerts the squad only with SQUAD_ALERT.
+from npc import Brute
+from fsm import Patrol, Engage, Retreat, ENGAGE
+
+
+def squad_of_three(world):
+    # one NPC in clear sight of the player, two out of range; all one squad
+    px, py = world.player.pos
+    npcs = [Brute(world, px - 300, py), Brute(world, px - 420, py), Brute(world, px - 400, py)]
+    for n in npcs:
+        world.add_npc(n)
+    world.perception.update(world)
+    world.squads.update()
+    assert len(set(world.squads.of)) == 1
+    return npcs
+
+
+def states(npcs):
+    return [type(n.fsm.current) for n in npcs]
+
+
+def test_spotting_alerts_only_the_spotter(world):
+    a, b, c = squad_of_three(world)
+    world.update_events()
+    assert states([a, b, c]) == [Engage, Patrol, Patrol]
+
+
+def test_squad_alert(world):
+    a, b, c = squad_of_three(world)
+    world.events.squad_alert = True
+    world.update_events()
+    assert states([a, b, c]) == [Engage, Engage, Engage]
+
+
+def test_ally_death_reaches_its_squad_only(world):
+    a, b, c = squad_of_three(world)
+    px, py = world.player.pos
+    far = Brute(world, px + 500, py - 250)
+    world.add_npc(far)
+    for n in (a, b, c, far):
+        n.fsm.change(ENGAGE)
+    world.perception.update(world)
+    world.squads.update()
+    assert world.squads.squad_of(far) != world.squads.squad_of(a)
+    c.health = 0
+    c.update(1 / 60)
+    world.update_events()
+    assert states([a, b, far]) == [Retreat, Retreat, Engage]
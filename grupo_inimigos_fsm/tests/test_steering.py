@@ -0,0 +1,100 @@
+# test_steering.py
+# BatchSteering forces against the per-object reference in steering.py /
+# BaseNPC.steer_to, and the per-object path (the default) against the batch
+# engine.
+import random
+
+import numpy as np
+import pytest
+
+from batch_steering import BatchSteering
+from steering import seek, separation, cohesion, alignment, SEP_RADIUS
+from npc import BaseNPC, Brute, Shooter, Support
+
+
+def engage_case(world):
+    rng = random.Random(5)
+    batch = BatchSteering()
+    batch.load(world.npcs)
+    live = [n for n in world.npcs if n.alive]
+    rows = np.array([n.idx for n in live], dtype=np.intp)
+    # the player or a path waypoint; no cohesion while on a path
+    targets = [world.player.pos if rng.random() < 0.5 else (rng.uniform(0, 1280), rng.uniform(0, 720))
+               for _ in live]
+    w_coh = np.array([0.35 if t is world.player.pos else 0.0 for t in targets])
+    return batch, live, rows, np.array(targets, dtype=np.float64), w_coh
+
+
+def test_engage_forces_match_reference(swarm):
+    batch, live, rows, targets, w_coh = engage_case(swarm)
+    got = batch.engage_forces(rows, targets, w_coh)
+
+    want = []
+    for npc, target, w in zip(live, targets.tolist(), w_coh.tolist()):
+        neigh = npc.neighbors()
+        sk = seek(npc.pos, target, npc.max_speed)
+        s = separation(npc, neigh)
+        c = cohesion(npc, neigh)
+        a = alignment(npc, neigh)
+        want.append([sk[k] + s[k] * 1.2 + c[k] * w + a[k] * 0.4 for k in (0, 1)])
+    np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-9)
+
+
+def test_squad_forces_match_reference(swarm):
+    world = swarm
+    world.perception.update(world)
+    world.squads.update()
+    batch, live, rows, targets, w_coh = engage_case(world)
+    got = batch.engage_forces(rows, targets, w_coh, world.squads)
+
+    want = []
+    for npc, target, w in zip(live, targets.tolist(), w_coh.tolist()):
+        sk = seek(npc.pos, target, npc.max_speed)
+        s = separation(npc, world.npcs_in_radius(npc.pos, SEP_RADIUS, exclude=npc))
+        c = world.squads.cohesion(npc, [0.0, 0.0])
+        a = world.squads.alignment(npc, [0.0, 0.0])
+        want.append([sk[k] + s[k] * 1.2 + c[k] * w + a[k] * 0.4 for k in (0, 1)])
+    np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-9)
+
+
+def test_separation_skips_coincident_npcs(world):
+    # two NPCs on exactly the same point: no push, no ZeroDivisionError
+    a = Brute(world, 500.0, 300.0)
+    b = Shooter(world, 500.0, 300.0)
+    c = Support(world, 530.0, 300.0)
+    for npc in (a, b, c):
+        world.add_npc(npc)
+    got = separation(a, [b, c])
+    assert got == separation(a, [c])
+
+    batch = BatchSteering()
+    batch.load(world.npcs)
+    sep, _, _ = batch.flock_forces(np.array([a.idx], dtype=np.intp))
+    np.testing.assert_allclose(sep[0], got, rtol=1e-9, atol=1e-9)
+
+    # the default per-object path steps through them
+    world.broadcast_engage()
+    for _ in range(10):
+        world.update(1 / 60)
+    assert all(np.isfinite(n.pos).all() for n in world.npcs)
+
+
+@pytest.mark.parametrize("squads", [True, False])
+def test_default_steer_to_matches_batch(swarm, monkeypatch, squads):
+    # BaseNPC.steer_to with BATCH_STEERING off (the default): the force it
+    # hands to apply_force equals the batch engine's for the same inputs
+    world = swarm
+    if squads:
+        world.perception.update(world)
+        world.squads.update()
+    else:
+        world.squads = None
+    assert world.batch_steering is None
+    batch, live, rows, targets, w_coh = engage_case(world)
+    want = batch.engage_forces(rows, targets, w_coh, world.squads)
+
+    got = []
+    monkeypatch.setattr(BaseNPC, "apply_force", lambda self, force, dt: got.append(list(force)))
+    for npc, target, w in zip(live, targets.tolist(), w_coh.tolist()):
+        npc.steer_to(target, w, 1 / 60)
+    np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-9)